@@ -2,18 +2,24 @@ import requests
 import json
 import socket
 import time
+from operator import itemgetter
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sort key for events (itemgetter runs in C, unlike a lambda)
+_BY_TIMESTAMP = itemgetter('timestamp')
+
 class ActivityWatchClient:
     def __init__(self, host: str = "localhost", port: int = 5600):
         self.host = host
         self.port = port
         self.base_url = f"http://{host}:{port}/api/0"
         self.hostname = socket.gethostname()
+        # Today's events per bucket, extended incrementally by get_multi_timeframe_data
+        self._event_cache: Dict[str, dict] = {}
         
     def _make_request(self, endpoint: str, method: str = "GET", data: Optional[dict] = None, retries: int = 3) -> Optional[dict]:
         """Make HTTP request to ActivityWatch API with error handling and retries"""
@@ -185,7 +191,7 @@ class ActivityWatchClient:
         
         if events:
             # Sort events by timestamp
-            events.sort(key=lambda x: x['timestamp'])
+            events.sort(key=_BY_TIMESTAMP)
         
         return events
     
@@ -217,7 +223,7 @@ class ActivityWatchClient:
             logger.warning("No web bucket found")
         
         # Sort events by timestamp
-        web_events.sort(key=lambda x: x['timestamp'])
+        web_events.sort(key=_BY_TIMESTAMP)
         
         return web_events
     
@@ -248,7 +254,7 @@ class ActivityWatchClient:
         
         events = self.get_events(afk_bucket, start_time, end_time)
         if events:
-            events.sort(key=lambda x: x['timestamp'])
+            events.sort(key=_BY_TIMESTAMP)
         
         return events
     
@@ -261,27 +267,88 @@ class ActivityWatchClient:
         }
     
     def get_multi_timeframe_data(self) -> Dict[str, Dict[str, List[dict]]]:
-        """Get data for multiple timeframes: 5min, 10min, 30min, 1hr, today"""
+        """Get data for multiple timeframes: 5min, 10min, 30min, 1hr, today.
+        
+        Events are fetched once per bucket, from midnight UTC or an hour back if that is earlier,
+        and then only extended with new events on later calls; every timeframe, including
+        today, is sliced from that list locally.
+        """
         timeframes = {
             '5_minutes': 5/60,
             '10_minutes': 10/60,
             '30_minutes': 0.5,
-            '1_hour': 1.0,
-            'today': 24.0  # Will be adjusted to start of day
+            '1_hour': 1.0
+        }
+        
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        end_time = now - timedelta(seconds=2)
+        day_start = now.replace(hour=0, minute=0, second=0)
+        # Shortly after midnight the hour window reaches back into yesterday
+        fetch_start = min(day_start, end_time - timedelta(hours=max(timeframes.values())))
+        
+        buckets = self.get_buckets()
+        recent = {}
+        for kind, prefix in (('window', 'aw-watcher-window_'), ('web', 'aw-watcher-web'), ('afk', 'aw-watcher-afk_')):
+            bucket_id = self._select_bucket(buckets, prefix)
+            recent[kind] = self._get_todays_events(bucket_id, day_start, fetch_start, end_time) if bucket_id else []
+        
+        # End time of every event, computed once and shared by all timeframe slices
+        event_ends = {
+            kind: [self._parse_timestamp(e['timestamp']) + timedelta(seconds=e.get('duration', 0)) for e in events]
+            for kind, events in recent.items()
         }
         
         data = {}
         for timeframe, hours in timeframes.items():
-            if timeframe == 'today':
-                # Get from start of day
-                now = datetime.now(timezone.utc)
-                hours_since_midnight = now.hour + now.minute/60
-                data[timeframe] = self.get_all_events(hours_since_midnight)
-            else:
-                data[timeframe] = self.get_all_events(hours)
+            start_time = end_time - timedelta(hours=hours)
+            data[timeframe] = {
+                kind: [e for e, ends_at in zip(events, event_ends[kind]) if ends_at >= start_time]
+                for kind, events in recent.items()
+            }
+        data['today'] = {
+            kind: [e for e, ends_at in zip(events, event_ends[kind]) if ends_at >= day_start]
+            for kind, events in recent.items()
+        }
         
         return data
     
+    def _select_bucket(self, buckets: Dict[str, dict], prefix: str) -> Optional[str]:
+        """Pick the most recently updated bucket whose name starts with prefix"""
+        candidates = [(name, info.get('last_updated') or '') for name, info in buckets.items() if name.startswith(prefix)]
+        if not candidates:
+            return None
+        return max(candidates, key=itemgetter(1))[0]
+    
+    def _get_todays_events(self, bucket_id: str, day_start: datetime, fetch_start: datetime,
+                           end_time: datetime) -> List[dict]:
+        """Get a bucket's events since fetch_start (today's, plus up to an hour before midnight),
+        only fetching what is new since the last call. The cache is rebuilt when the day changes."""
+        cache = self._event_cache.get(bucket_id)
+        
+        if cache is None or cache['day_start'] != day_start or not cache['events']:
+            events = self.get_events(bucket_id, fetch_start, end_time)
+            events.sort(key=_BY_TIMESTAMP)
+            self._event_cache[bucket_id] = {'day_start': day_start, 'events': events}
+            return events
+        
+        # Re-fetch from the newest cached event on, since heartbeats keep extending it
+        events = cache['events']
+        since = self._parse_timestamp(events[-1]['timestamp'])
+        new_events = self.get_events(bucket_id, since, end_time)
+        if new_events:
+            new_events.sort(key=_BY_TIMESTAMP)
+            cutoff = new_events[0]['timestamp']
+            while events and events[-1]['timestamp'] >= cutoff:
+                events.pop()
+            events.extend(new_events)
+        
+        return events
+    
+    @staticmethod
+    def _parse_timestamp(timestamp: str) -> datetime:
+        """Parse an ActivityWatch ISO timestamp (which may use a Z suffix)"""
+        return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    
     def get_afk_status(self) -> bool:
         """Check if user is currently AFK (Away From Keyboard)"""
         buckets = self.get_buckets()
@@ -312,7 +379,7 @@ class ActivityWatchClient:
             return False
         
         # Get the most recent event
-        latest_event = max(events, key=lambda x: x['timestamp'])
+        latest_event = max(events, key=_BY_TIMESTAMP)
         
         # Check if the latest event indicates AFK
         return latest_event.get('data', {}).get('status') == 'afk'
@@ -1,21 +1,139 @@
 import json
 import time
 import logging
+import logging.handlers
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List
+import os
+import queue
 import signal
+import threading
 import sys
 import argparse
+import heapq
+import hashlib
+import atexit
+import gzip
+import shutil
+from collections import Counter, OrderedDict, deque
+from itertools import islice
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+from statistics import fmean
+from types import MappingProxyType
+
+try:
+    import orjson  # Optional: faster JSON encoding/decoding for Ollama traffic
+except ImportError:
+    orjson = None
 
 from activitywatch_client import ActivityWatchClient
 from event_processor import EventProcessor
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Read-only default for nested .get() lookups in per-record loops, so a missing
+# key doesn't allocate a throwaway dict each time
+_EMPTY = MappingProxyType({})
+
+def _json_dumps(obj) -> bytes:
+    """Serialize a request payload, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode("utf-8")
+
+def _json_loads(data):
+    """Parse a JSON response body, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _read_json_file(path: Path):
+    """Load a JSON data file, using orjson when it is installed"""
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
+def _write_json_file(path: Path, obj):
+    """Write a JSON data file indented for humans, using orjson when it is installed.
+    The document goes to a sibling temp file that then replaces the original, so an interrupted
+    write leaves the previous version intact. No fsync: these are summaries, not a journal."""
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(obj, indent=2).encode("utf-8")
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def _json_pretty(obj) -> str:
+    """Indented JSON for verbose dumps, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, indent=2, default=str)
+
+def _context_size(*texts: str, num_predict: int) -> int:
+    """Smallest power-of-two num_ctx between 2K and 8K that fits the prompt texts plus the reply, so
+    short prompts don't reserve the full 8K KV cache. Tokens are estimated at ~4 characters each;
+    keeping to a few sizes limits Ollama model reloads."""
+    needed = sum(len(text) for text in texts) // 4 + num_predict + 64
+    return min(8192, max(2048, 1 << (needed - 1).bit_length()))
+
+def _extract_first_json_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} object in text (braces inside JSON strings are skipped)"""
+    start = text.find('{')
+    if start < 0:
+        return None
+    
+    depth = 0
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+def _next_local_time(after: float, hour: int) -> float:
+    """Epoch timestamp of the next hour:00 local time strictly after `after`"""
+    current = datetime.fromtimestamp(after)
+    target = current.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if target <= current:
+        target += timedelta(days=1)
+    return target.timestamp()
+
+def _next_half_hour(after: float) -> float:
+    """Epoch timestamp of the next :00 or :30 local time strictly after `after`"""
+    current = datetime.fromtimestamp(after).replace(second=0, microsecond=0)
+    minutes = 30 if current.minute < 30 else 60
+    return (current.replace(minute=0) + timedelta(minutes=minutes)).timestamp()
+
+class StreamInterrupted(Exception):
+    """A streamed response failed after part of it was already echoed to stdout.
+    `partial` holds the text shown so far; retrying would print the answer twice."""
+    def __init__(self, partial: str):
+        super().__init__("stream interrupted after partial output")
+        self.partial = partial
+
 # Custom logging formatter with short timestamp
 class ShortTimestampFormatter(logging.Formatter):
     def formatTime(self, record, datefmt=None):
-        from datetime import datetime
         dt = datetime.fromtimestamp(record.created)
         return dt.strftime('%m-%d %H:%M:%S.%f')[:-5]  # Remove last 5 digits of microseconds
 
@@ -30,30 +148,245 @@ for handler in logging.getLogger().handlers:
     handler.setFormatter(ShortTimestampFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
 logger = logging.getLogger(__name__)
 
+# Verbose per-check diagnostics: plain messages to stdout, buffered and written once per check.
+# Stays silent (WARNING level, no handler) unless CompanionCube is created with verbose=True.
+verbose_log = logging.getLogger(f"{__name__}.verbose")
+verbose_log.propagate = False
+verbose_log.setLevel(logging.WARNING)
+
+_PRODUCTIVITY_SYSTEM_PROMPT = """You are a specialized ADHD productivity coach analyzing behavioral patterns. Provide insights that are understanding, encouraging, and actionable for someone with ADHD.
+
+Given the user's productivity pattern data, provide:
+1. Pattern Recognition: interesting patterns you notice
+2. ADHD-Specific Insights: how these patterns relate to ADHD traits
+3. Personalized Suggestions: 2-3 specific, actionable recommendations
+4. Encouragement: celebrate what's working well
+5. Future Focus: gentle suggestions for optimization
+
+Be supportive, focus on patterns not judgments, celebrate small wins, keep a warm tone, use emojis appropriately, and stay under 250 words."""
+
+# Static instructions live in the system prompts so they form a stable prefix that
+# Ollama can reuse from its KV cache across runs; user prompts carry only the data.
+_DAILY_SUMMARY_SYSTEM_PROMPT = """You are a supportive ADHD productivity coach creating an end-of-day summary. 
+Be encouraging, celebrate small wins, acknowledge challenges without judgment, and provide gentle insights. 
+Keep the tone warm, personal, and supportive. Focus on progress and patterns, not perfection.
+
+Create a personalized, ADHD-friendly daily summary that:
+1. Celebrates Progress: acknowledge what they DID accomplish, however small
+2. Recognizes Patterns: note any interesting productivity patterns or behaviors
+3. Shows Understanding: demonstrate understanding of ADHD challenges and strengths
+4. Offers Encouragement: be genuinely supportive and warm
+5. Suggests Insights: gentle observations about their work style today
+
+Never shame or criticize, celebrate effort over perfection, acknowledge that some days are different than others, be specific about what you observed, keep it under 250 words, use encouraging emojis appropriately, and end with tomorrow-focused positivity.
+Remember: this person chose to use a productivity tool today - that itself shows self-care and intention!"""
+
+_WEEKLY_SYSTEM_PROMPT = """You are an ADHD productivity coach analyzing weekly patterns. 
+Identify trends, celebrate consistency, acknowledge challenges, and provide gentle insights about productivity patterns. 
+Be encouraging and focus on growth and self-understanding rather than judgment.
+
+Provide insights about:
+1. Consistency Patterns: what their usage pattern tells us about their routine
+2. Productivity Rhythms: trends in focus sessions or engagement levels
+3. Growth Observations: signs of developing better productivity habits
+4. ADHD-Specific Insights: how their usage patterns reflect common ADHD traits
+5. Gentle Recommendations: suggestions for optimizing their companion experience
+
+Celebrate any consistency even if imperfect, acknowledge that ADHD productivity isn't linear, focus on patterns not judgments, offer specific actionable suggestions, keep it encouraging and hopeful, keep the response under 350 words, and use emojis to make it engaging."""
+
+_DAILY_WORK_SYSTEM_PROMPT = "You are a productivity analyst creating daily work summaries from 30-minute activity records. Be practical, factual, and focus on accomplishments. Respond with JSON only."
+_COMPANION_SYSTEM_PROMPT = "You are a supportive ADHD companion. Be encouraging, never judgmental. Keep responses very concise."
+_HOURLY_SYSTEM_PROMPT = "You are a supportive ADHD productivity coach providing brief hourly check-ins. Be warm, encouraging, and focus on small wins."
+
+# Ollama sampling options for each kind of request, tuned in one place. Read-only and
+# shared between calls: call sites copy them into the request, merging in per-call
+# values such as num_ctx (read-only mappings don't serialize to JSON as they are)
+_LLM_OPTIONS = MappingProxyType({
+    "state_analysis": MappingProxyType({
+        "temperature": 0.3,  # Lower temperature for more consistent analysis
+        "num_predict": 200,  # The JSON answer is ~100 tokens
+        "num_ctx": 4096,  # System prompt + compact payload fit comfortably; 8K only costs prefill
+        "top_k": 40,
+        "top_p": 0.9
+    }),
+    "companion": MappingProxyType({
+        "temperature": 0.7,
+        "num_predict": 50  # Limit response length
+    }),
+    "daily_work": MappingProxyType({
+        "temperature": 0.6,
+        "top_k": 40,
+        "top_p": 0.9
+    }),
+    "daily_summary": MappingProxyType({
+        "temperature": 0.8,
+        "num_predict": 300,  # Longer response for daily summary
+        "top_k": 40,
+        "top_p": 0.9
+    }),
+    "hourly": MappingProxyType({
+        "temperature": 0.7,
+        "num_predict": 100,
+        "top_k": 40,
+        "top_p": 0.9
+    }),
+    "weekly": MappingProxyType({
+        "temperature": 0.7,
+        "num_predict": 400  # Even longer for weekly insights
+    }),
+    "insights": MappingProxyType({
+        "temperature": 0.8,
+        "num_predict": 300,
+        "top_k": 40,
+        "top_p": 0.9,
+        "stop": ("\n\n\n",)  # Stop at the first run of blank lines instead of padding out
+    }),
+})
+
+# Fixed parts of the insight requests; call sites add the current model, the prompt and the options.
+# A keep_alive of 10m keeps the model (and its prompt cache) resident between insight calls
+_HOURLY_REQUEST = {
+    "system": _HOURLY_SYSTEM_PROMPT,
+    "stream": True,  # Collect the summary as it is generated
+}
+_WEEKLY_REQUEST = {
+    "system": _WEEKLY_SYSTEM_PROMPT,
+    "stream": True,  # Show insights as soon as the first tokens arrive
+    "keep_alive": "10m"
+}
+_INSIGHTS_REQUEST = {
+    "system": _PRODUCTIVITY_SYSTEM_PROMPT,
+    "stream": True,  # Show insights as soon as the first tokens arrive
+    "keep_alive": "10m"
+}
+
+# Accepted values in an LLM state analysis
+_REQUIRED_STATE_FIELDS = ('current_state', 'focus_trend', 'distraction_trend')
+_VALID_STATES = frozenset({'flow', 'working', 'needs_nudge', 'afk'})
+_VALID_FOCUS_TRENDS = frozenset({'maintaining_focus', 'entering_focus', 'losing_focus', 'variable', 'none'})
+_VALID_DISTRACTION_TRENDS = frozenset({'low', 'moderate', 'increasing', 'decreasing', 'high'})
+
+# Everything static about the state analysis (data legend, rules, examples, output schema) lives in
+# the system prompt; the user prompt is only the compact JSON activity payload
+_STATE_ANALYSIS_SYSTEM_PROMPT = """You are an expert ADHD productivity analyst. Analyze the provided raw activity data and determine the user's current productivity state. Be precise and data-driven in your analysis. Return your analysis in the exact JSON format requested.
+
+📊 ACTIVITY DATA FORMAT (JSON, window activity only):
+- afk: whether the AFK watcher currently reports the user as away from keyboard
+- current_app: the most recently used application
+- stats_5m / stats_30m: active_minutes, context_switches and apps used in the last 5 / 30 minutes
+- trend: productivity trend across timeframes; dominant_apps: top apps per timeframe
+- current: activity in the last 5 minutes as [minutes, app, window title]
+- context: significant activity from longer timeframes as [minutes, timeframe, app]
+- switches_total / switches: number of context switches in the last 5 minutes and the most recent ones as "from → to"
+
+🎯 ANALYSIS TASK:
+Based on this raw data, determine the user's current state for ADHD productivity support.
+
+Consider these ADHD-relevant factors:
+1. **Focus Duration**: Long sessions (>15min) in one app suggest flow state
+2. **Context Switching**: Rapid switches may indicate distractibility or task exploration  
+3. **Activity Patterns**: Are they deep in work, browsing, or switching between tasks?
+4. **Productivity Indicators**: Tools like IDEs, documents, vs entertainment/social media
+5. **Time Investment**: Duration spent on different types of activities
+
+🚦 SIMPLIFIED 2-BUCKET ANALYSIS (AFK + WINDOW):
+
+1️⃣ **AFK BUCKET**: 
+   → If currently AFK = true → state = "afk" (ignore everything else)
+
+2️⃣ **WINDOW BUCKET** (focus on current app activity):
+   → Code editor (Code.exe, vim, etc.) → "flow" or "working"
+   → Communication (Weixin.exe, slack) → "working" 
+   → Terminal/PowerShell → "working"
+   → Browser apps → analyze based on context and duration
+   → Entertainment/games → "needs_nudge"
+   → Multiple rapid app switches → "needs_nudge"
+
+⚠️ SIMPLIFIED APPROACH: Focus on window activity patterns only. Web bucket data removed due to timing inaccuracies.
+
+EXAMPLE CORRECT ANALYSIS:
+
+🟢 FLOW STATE: 
+- Current app: "Code.exe" → Extended coding session → "flow"
+- Long duration (>15min) in productive app with minimal switching
+
+🟡 WORKING: 
+- Current app: "Weixin.exe" → Communication/coordination → "working"
+- Current app: "WindowsTerminal.exe" → Development work → "working"
+- Moderate app switching between productive tools
+
+🟠 NEEDS_NUDGE: 
+- Rapid switching between multiple apps in short time
+- Extended time in entertainment/social apps
+- Fragmented attention patterns
+
+🔴 AFK: Currently AFK = true → "afk" (ignore everything else)
+
+✅ SIMPLIFIED ANALYSIS FOCUS:
+- Base decisions on window activity patterns only
+- Consider duration, app types, and switching frequency
+- Ignore web bucket data (removed due to timing inaccuracies)
+
+REQUIRED OUTPUT FORMAT (JSON):
+{
+  "current_state": "[flow|working|needs_nudge|afk]",
+  "focus_trend": "[maintaining_focus|entering_focus|losing_focus|variable|none]", 
+  "distraction_trend": "[low|moderate|increasing|decreasing|high]",
+  "confidence": "[high|medium|low]",
+  "primary_activity": "[brief description]",
+  "reasoning": "[2-3 sentence explanation of the analysis]"
+}
+
+Analyze the data and respond with ONLY the JSON object above."""
+
 class CompanionCube:
     def __init__(self, check_interval: int = 60, mode: str = "coach", verbose: bool = False):
         self.check_interval = check_interval
         self.mode = mode
         self.verbose = verbose
+        self._verbose_handler = None
+        if verbose:
+            stdout_handler = logging.StreamHandler(sys.stdout)
+            stdout_handler.setFormatter(logging.Formatter('%(message)s'))
+            self._verbose_handler = logging.handlers.MemoryHandler(
+                capacity=64, flushLevel=logging.WARNING, target=stdout_handler
+            )
+            verbose_log.addHandler(self._verbose_handler)
+            verbose_log.setLevel(logging.DEBUG)
         self.aw_client = ActivityWatchClient()
         self.event_processor = EventProcessor()
         
         # Ollama settings
         self.ollama_url = "http://localhost:11434"
+        self._generate_url = f"{self.ollama_url}/api/generate"
         self.model = "mistral"  # Default model
+        # No speculative decoding: Ollama's /api/generate has no draft-model option
+        
+        # Shared HTTP session so Ollama calls reuse keep-alive connections
+        self.http = requests.Session()
+        self.http.headers.update({'Connection': 'keep-alive'})
+        # Retry only connection failures; a read timeout means Ollama is busy generating and
+        # resending the prompt would just queue a second generation behind it
+        retries = Retry(total=2, connect=2, read=0, backoff_factor=0.2)
+        self.http.mount(self.ollama_url, HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries))
         
         # File paths for new organized data storage
         self.data_dir = Path("data")
         self.data_dir.mkdir(exist_ok=True)
-        self.log_file = self.data_dir / "log.json"  # 5-minute activity summaries
+        self.log_file = self.data_dir / "log.jsonl"  # 5-minute activity summaries, one JSON object per line
+        self.log_retention_days = 7  # Rotated (gzipped) daily logs to keep
         self.daily_summary_file = self.data_dir / "daily_summary.json"  # Daily summaries with 30-min periods
+        self.insights_cache_dir = self.data_dir / "insights_cache"  # Productivity insights keyed by prompt hash
+        self.insights_cache_ttl = 6 * 60 * 60  # Reuse cached insights for 6 hours
         
         # State tracking
-        self.last_intervention = datetime.now(timezone.utc)
-        self.last_activity_log = datetime.now(timezone.utc)  # For 5-minute logs
-        self.last_thirty_minute_summary = datetime.now(timezone.utc)  # For 30-minute summaries
-        self.last_minute_summary = datetime.now(timezone.utc)  # For verbose mode
-        self.last_daily_summary_date = datetime.now().date()  # Track daily summaries at 4am
+        self._last_intervention_mono = time.monotonic()  # For intervention cooldowns
+        self._last_activity_log_mono = time.monotonic()  # For 5-minute logs
+        self._last_minute_mono = time.monotonic()  # For verbose mode
+        self._last_hourly_mono = time.monotonic()  # For hourly summaries
+        # Scheduled summaries as epoch timestamps of their next run (daily at 4am, every :00 and :30)
+        self._next_daily_summary_ts = _next_local_time(time.time(), hour=4)
+        self._next_thirty_minute_ts = _next_half_hour(time.time())
         
         self.intervention_cooldown = {
             "flow": 45,  # Don't interrupt flow for 45 minutes
@@ -69,15 +402,58 @@ class CompanionCube:
             'interventions': 0
         }
         
+        # In-memory ring of the last 7 days of hourly summaries (loaded lazily, flushed periodically)
+        self._hourly_ring = None
+        self._hourly_unflushed = 0
+        
+        # Append-only activity log, written by a background thread (started lazily) and rotated at day change
+        self._log_queue = queue.Queue()
+        self._log_writer_thread = None
+        self._log_fp = None
+        self._log_day = None
+        
+        # Parsed history logs keyed by path, reused while the file's mtime is unchanged
+        self._history_cache = {}
+        
+        # Recent LLM state analyses keyed by a fingerprint of the activity they were based on
+        self._analysis_cache = OrderedDict()
+        self.analysis_cache_ttl = 120  # Seconds an unchanged activity picture reuses its analysis
+        self.analysis_cache_size = 32
+        
+        # Today's 30-minute summaries, consumed and reset by the 4am daily summary
+        self._thirty_min_summaries = []
+        
+        # Single worker for the daily LLM summary, created on first use. The 30-minute summary makes
+        # no LLM call and runs on the main loop, the only thread that reads ActivityWatch or daily_stats
+        self._summary_executor = None
+        
+        # Set by stop() to end the main loop without waiting out the current interval
+        self._stop_event = threading.Event()
+        
         # Set up graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
+        atexit.register(self.shutdown)
     
     def _signal_handler(self, signum, frame):
         """Handle Ctrl+C gracefully - no summary generation"""
         print("\n\n💫 Companion Cube shutting down...")
         print("Great work today! See you next time! 🌟")
+        # Drop queued summaries now: the executor's exit hook would otherwise run them before atexit
+        if self._summary_executor is not None:
+            self._summary_executor.shutdown(wait=False, cancel_futures=True)
         sys.exit(0)
     
+    def shutdown(self):
+        """Flush buffered logs and release the summary worker and Ollama connections (runs at exit)"""
+        if self._summary_executor is not None:
+            self._summary_executor.shutdown(wait=False, cancel_futures=True)
+        self._flush_logs()
+        self.http.close()
+    
+    def stop(self):
+        """Ask the main loop to exit at the next opportunity"""
+        self._stop_event.set()
+    
     def test_connections(self) -> Dict[str, any]:
         """Test connections to ActivityWatch and Ollama"""
         results = {
@@ -128,10 +504,10 @@ class CompanionCube:
         
         try:
             # Test connection
-            response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
+            response = self.http.get(f"{self.ollama_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 result['connected'] = True
-                data = response.json()
+                data = _json_loads(response.content)
                 result['models'] = [model['name'] for model in data.get('models', [])]
                 
                 # Check if our selected model is available
@@ -172,32 +548,43 @@ class CompanionCube:
         # Schedule end of day summary
         self.last_summary_date = datetime.now().date()
         
-        while True:
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
             try:
+                # One clock read per tick, shared by every check below
                 now = datetime.now()
+                now_ts = now.timestamp()
+                now_utc = now.astimezone(timezone.utc)
                 
                 # Check for daily summary at 4am (not midnight)
-                if (now.hour == 4 and now.minute < 5 and 
-                    now.date() > self.last_daily_summary_date):
-                    self.generate_daily_summary()
-                    self.last_daily_summary_date = now.date()
+                if now_ts >= self._next_daily_summary_ts:
+                    # Hand the day's data over here, so the worker never shares it with check_activity
+                    self._run_in_background(self.generate_daily_summary, *self._start_new_day())
+                    self._next_daily_summary_ts = _next_local_time(now_ts, hour=4)
                 
                 # Check for 30-minute summaries at :00 and :30
-                if now.minute in [0, 30] and now.minute != getattr(self, '_last_30min_check', -1):
+                if now_ts >= self._next_thirty_minute_ts:
                     self.generate_thirty_minute_summary()
-                    self._last_30min_check = now.minute
+                    self._next_thirty_minute_ts = _next_half_hour(now_ts)
                 
                 # Check for minute summaries in verbose mode only
                 if self.verbose:
                     self.check_minute_summary()
                 
                 # Main activity check and 5-minute logging
-                self.check_activity()
-                time.sleep(self.check_interval)
+                self.check_activity(now_utc)
                 
             except Exception as e:
                 logger.error(f"Error in main loop: {e}")
-                time.sleep(self.check_interval)
+            
+            # Ticks stay on a fixed start + n*interval grid so slow LLM calls don't accumulate
+            # drift; if a tick overran a whole interval, skip ahead rather than firing back-to-back
+            next_tick += self.check_interval
+            now_mono = time.monotonic()
+            if now_mono - next_tick > self.check_interval:
+                next_tick = now_mono + self.check_interval
+            # Returns early as soon as stop() is called
+            self._stop_event.wait(max(0.0, next_tick - now_mono))
     
     def analyze_user_state_with_llm(self, multi_timeframe_data: Dict) -> Dict:
         """Use LLM to analyze raw activity data and determine user state"""
@@ -205,71 +592,167 @@ class CompanionCube:
             # Prepare raw data for LLM analysis
             raw_data = self.event_processor.prepare_raw_data_for_llm(multi_timeframe_data)
             
+            # Obvious cases (away, switching frantically, long uninterrupted focus) don't need the LLM
+            verdict = self._quick_rule_verdict(raw_data)
+            if verdict:
+                if self.verbose:
+                    verbose_log.debug(f"\n⚡ Clear-cut state ({verdict['current_state']}) - skipping LLM state analysis")
+                return verdict
+            
+            # Steady activity (e.g. deep in one app) reuses the last analysis instead of
+            # another LLM round trip; verbose mode always re-runs so the prompt can be shown
+            cache_key = None
+            if not self.verbose:
+                cache_key = self._state_fingerprint(raw_data)
+                cached = self._analysis_cache.get(cache_key)
+                if cached and time.monotonic() - cached[0] < self.analysis_cache_ttl:
+                    self._analysis_cache.move_to_end(cache_key)
+                    return dict(cached[1])
+            
             # Create comprehensive prompt for state analysis
             analysis_prompt = self._create_state_analysis_prompt(raw_data)
             
             if self.verbose:
-                print(f"\n🧠 LLM STATE ANALYSIS")
-                print(f"Raw data summary: {len(raw_data.get('activity_timeline', []))} timeline events")
-                print(f"Context switches: {len(raw_data.get('context_switches', []))}")
-                print("Sending comprehensive data to LLM for analysis...")
-                print(f"\n{'='*60}")
-                print(f"🧠 LLM STATE ANALYSIS PROMPT")
-                print(f"{'='*60}")
-                print(analysis_prompt[:2000] + "..." if len(analysis_prompt) > 2000 else analysis_prompt)
-                print(f"{'='*60}")
+                verbose_log.debug(f"\n🧠 LLM STATE ANALYSIS")
+                verbose_log.debug(f"Raw data summary: {len(raw_data.get('activity_timeline', []))} timeline events")
+                verbose_log.debug(f"Context switches: {len(raw_data.get('context_switches', []))}")
+                verbose_log.debug("Sending comprehensive data to LLM for analysis...")
+                verbose_log.debug(f"\n{'='*60}")
+                verbose_log.debug(f"🧠 LLM STATE ANALYSIS PROMPT")
+                verbose_log.debug(f"{'='*60}")
+                verbose_log.debug(analysis_prompt[:2000] + "..." if len(analysis_prompt) > 2000 else analysis_prompt)
+                verbose_log.debug(f"{'='*60}")
             
             # Get LLM analysis
-            system_prompt = """You are an expert ADHD productivity analyst. Analyze the provided raw activity data and determine the user's current productivity state. Be precise and data-driven in your analysis. Return your analysis in the exact JSON format requested."""
+            system_prompt = _STATE_ANALYSIS_SYSTEM_PROMPT
             
             request_data = {
                 "model": self.model,
                 "prompt": analysis_prompt,
                 "system": system_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.3,  # Lower temperature for more consistent analysis
-                    "num_predict": 400,
-                    "num_ctx": 8192,  # Use full 8K context window for Mistral 7B
-                    "top_k": 40,
-                    "top_p": 0.9
-                }
+                "stream": True,  # Lets us hang up as soon as a complete analysis has arrived
+                "options": dict(_LLM_OPTIONS["state_analysis"]),
+                "keep_alive": "30m"  # Keep the model and its system-prompt cache resident between checks
             }
             
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json=request_data,
+            response = self.http.post(
+                self._generate_url,
+                data=_json_dumps(request_data),
+                headers=_JSON_HEADERS,
+                stream=True,
                 timeout=30
             )
             
             if response.status_code == 200:
-                result = response.json()
-                llm_response = result.get("response", "").strip()
+                llm_response = self._read_streamed_response(
+                    response, stop_when=lambda text: self._parse_llm_state_analysis(text) is not None
+                )
                 
                 if self.verbose:
-                    print(f"🤖 LLM Analysis Response:")
-                    print(llm_response)
+                    verbose_log.debug(f"🤖 LLM Analysis Response:")
+                    verbose_log.debug(llm_response)
                 
                 # Parse structured response
                 parsed_analysis = self._parse_llm_state_analysis(llm_response)
                 
                 if parsed_analysis:
-                    return parsed_analysis
+                    if cache_key is not None:
+                        self._analysis_cache[cache_key] = (time.monotonic(), parsed_analysis)
+                        self._analysis_cache.move_to_end(cache_key)
+                        if len(self._analysis_cache) > self.analysis_cache_size:
+                            self._analysis_cache.popitem(last=False)
+                    return dict(parsed_analysis)
                 else:
                     if self.verbose:
-                        print("⚠️ Failed to parse LLM response, using fallback analysis")
+                        verbose_log.debug("⚠️ Failed to parse LLM response, using fallback analysis")
                     return self._fallback_state_analysis(raw_data)
             else:
                 if self.verbose:
-                    print(f"⚠️ LLM request failed (status {response.status_code}), using fallback")
+                    verbose_log.debug(f"⚠️ LLM request failed (status {response.status_code}), using fallback")
                 return self._fallback_state_analysis(raw_data)
                 
         except Exception as e:
             logger.debug(f"Error in LLM state analysis: {e}")
             if self.verbose:
-                print(f"⚠️ LLM analysis error: {e}")
+                verbose_log.debug(f"⚠️ LLM analysis error: {e}")
             return self._fallback_state_analysis(raw_data)
     
+    def _quick_rule_verdict(self, raw_data: Dict) -> Optional[Dict]:
+        """Return a high-confidence state for unambiguous activity, or None to let the LLM decide"""
+        timeframes = raw_data.get('timeframes', {})
+        recent_stats = timeframes.get('5_minutes', {}).get('statistics', {})
+        medium_stats = timeframes.get('30_minutes', {}).get('statistics', {})
+        active_time = recent_stats.get('total_active_minutes', 0)
+        switch_count = recent_stats.get('context_switches', 0)
+        
+        if self._latest_afk_status(raw_data) == 'afk':
+            state, focus, distraction = 'afk', 'none', 'low'
+            activity, reasoning = 'Away from keyboard', 'ActivityWatch AFK watcher reports the user as away.'
+        elif active_time < 0.5:
+            state, focus, distraction = 'afk', 'none', 'low'
+            activity, reasoning = 'No activity', 'Less than 30 seconds of window activity in the last 5 minutes.'
+        elif switch_count >= 10:
+            state, focus, distraction = 'needs_nudge', 'losing_focus', 'high'
+            activity, reasoning = 'Rapid app switching', f'{switch_count} context switches in the last 5 minutes.'
+        elif (switch_count == 0 and medium_stats.get('context_switches', 0) <= 1
+              and medium_stats.get('total_active_minutes', 0) >= 25
+              and not self._has_recent_distraction(timeframes)):
+            state, focus, distraction = 'flow', 'maintaining_focus', 'low'
+            activity = f"Sustained work in {', '.join(recent_stats.get('unique_apps', [])) or 'one app'}"
+            reasoning = 'At least 25 active minutes in the last half hour with at most one app switch.'
+        else:
+            return None
+        
+        return {
+            'current_state': state,
+            'focus_trend': focus,
+            'distraction_trend': distraction,
+            'confidence': 'high',
+            'primary_activity': activity,
+            'reasoning': reasoning
+        }
+
+    def _has_recent_distraction(self, timeframes: Dict) -> bool:
+        """Whether any app, domain or window title from the last half hour matches a distraction
+        keyword - a long stretch in one window is only flow if it isn't YouTube or a game"""
+        processor = self.event_processor
+        for timeframe in ('5_minutes', '30_minutes'):
+            timeframe_data = timeframes.get(timeframe, {})
+            stats = timeframe_data.get('statistics', {})
+            if any(processor._is_distraction_app(app) for app in stats.get('unique_apps', [])):
+                return True
+            if any(processor._is_distraction_domain(domain) for domain in stats.get('unique_domains', [])):
+                return True
+            # Browsers show the site only in the window title
+            if any(processor._is_distraction_app(event.get('title', ''))
+                   for event in timeframe_data.get('window_events', [])):
+                return True
+        return False
+
+    def _latest_afk_status(self, raw_data: Dict) -> Optional[str]:
+        """Status ('afk' / 'not-afk') of the most recent AFK event in the last 5 minutes, if any"""
+        afk_events = raw_data.get('timeframes', {}).get('5_minutes', {}).get('afk_events', [])
+        if not afk_events:
+            return None
+        # ActivityWatchClient hands events over sorted by timestamp, so the newest is last
+        return afk_events[-1].get('data', {}).get('status')
+
+    def _state_fingerprint(self, raw_data: Dict) -> bytes:
+        """Hash the parts of the activity data that drive the state analysis"""
+        recent_timeframe = raw_data.get('timeframes', {}).get('5_minutes', {})
+        recent_stats = recent_timeframe.get('statistics', {})
+        
+        current_app = next((e['name'] for e in reversed(raw_data.get('activity_timeline', []))
+                            if e['type'] == 'app' and e['name']), None)
+        fingerprint = [
+            current_app,
+            self._latest_afk_status(raw_data),
+            sorted(recent_stats.get('unique_apps', [])),
+            recent_stats.get('context_switches', 0),
+            round(recent_stats.get('total_active_minutes', 0)),
+        ]
+        return hashlib.blake2b(_json_dumps(fingerprint), digest_size=16).digest()
+
     def _create_state_analysis_prompt(self, raw_data: Dict) -> str:
         """Create a comprehensive prompt for LLM state analysis"""
         
@@ -284,198 +767,76 @@ class CompanionCube:
         context_switches = raw_data.get('context_switches', [])
         
         # Check AFK status first
-        recent_afk_events = recent_timeframe.get('afk_events', [])
-        is_currently_afk = False
-        if recent_afk_events:
-            latest_afk = max(recent_afk_events, key=lambda x: x['timestamp'])
-            is_currently_afk = latest_afk.get('data', {}).get('status') == 'afk'
+        is_currently_afk = self._latest_afk_status(raw_data) == 'afk'
 
-        # Get current window context (web analysis removed)
+        # One pass over the timeline: most recent app (web analysis removed) and the
+        # current/historical app events for the timeline sections below
         current_app = None
+        current_app_events = []
+        context_app_events = []
+        has_context_events = False
+        
+        for event in timeline:
+            priority = event.get('priority')
+            if priority == 'context':
+                has_context_events = True
+            if event['type'] != 'app':
+                continue
+            if event['name']:
+                current_app = event['name']
+            if priority == 'current':
+                current_app_events.append(event)
+            elif priority == 'context':
+                context_app_events.append(event)
+
+        patterns = raw_data.get('patterns', {})
+        activity = {
+            'afk': is_currently_afk,
+            'current_app': current_app,
+            'stats_5m': {
+                'active_minutes': recent_stats.get('total_active_minutes', 0),
+                'context_switches': recent_stats.get('context_switches', 0),
+                'apps': recent_stats.get('unique_apps', [])[:5]
+            },
+            'stats_30m': {
+                'active_minutes': medium_stats.get('total_active_minutes', 0),
+                'context_switches': medium_stats.get('context_switches', 0),
+                'apps': medium_stats.get('unique_apps', [])[:10]
+            },
+            'trend': patterns.get('productivity_trend', 'unknown'),
+            'dominant_apps': {tf: apps[:3] for tf, apps in patterns.get('dominant_apps_by_timeframe', {}).items() if apps},
+            'current': [
+                [round(e.get('duration_minutes', 0), 1), e['name'], (e.get('title') or '')[:60]]
+                for e in current_app_events
+            ],
+            'context': [
+                [round(e.get('duration_minutes', 0), 1), e.get('timeframe_source', 'unknown'), e['name']]
+                for e in context_app_events[:15]
+            ] if has_context_events else [],
+            'switches_total': raw_data.get('total_context_switches', len(context_switches)),
+            'switches': [f"{sw['from_app']} → {sw['to_app']}" for sw in context_switches]
+        }
         
-        if timeline:
-            # Find most recent app
-            for event in reversed(timeline):
-                if event['type'] == 'app' and event['name']:
-                    current_app = event['name']
-                    break
-
-        prompt = f"""Analyze this user's raw activity data and determine their current productivity state for ADHD support.
-
-📊 RAW ACTIVITY DATA ANALYSIS
-
-🚦 AFK STATUS CHECK:
-- Currently AFK: {is_currently_afk}
-{"- User is away from keyboard - state should be 'afk'" if is_currently_afk else "- User is active at computer"}
-
-🪟 CURRENT WINDOW CONTEXT:
-- Current application: {current_app or 'Unknown'}
-
-📊 ACTIVITY FOCUS:
-- Analysis based on window activity only (web bucket removed due to timing issues)
-- Focus on app usage patterns, duration, and context switching behavior
-
-⏱️ TIMEFRAME STATISTICS:
-Recent 5 minutes:
-- Active time: {recent_stats.get('total_active_minutes', 0)} minutes
-- Context switches: {recent_stats.get('context_switches', 0)}
-- Unique apps: {len(recent_stats.get('unique_apps', []))}
-- Unique domains: {len(recent_stats.get('unique_domains', []))}
-- Apps used: {', '.join(recent_stats.get('unique_apps', [])[:5])}
-
-Last 30 minutes:
-- Active time: {medium_stats.get('total_active_minutes', 0)} minutes  
-- Context switches: {medium_stats.get('context_switches', 0)}
-- Unique apps: {len(medium_stats.get('unique_apps', []))}
-- Unique domains: {len(medium_stats.get('unique_domains', []))}
-
-📊 CROSS-TIMEFRAME PATTERNS:
-{self._format_patterns_for_prompt(raw_data.get('patterns', {}))}
-
-📅 COMPREHENSIVE ACTIVITY TIMELINE:"""
-
-        # Add timeline details - PRIORITIZED for LLM context efficiency
-        if timeline:
-            prompt += f"\nPrioritized activity sequence ({len(timeline)} events - recent 5min data first, then historical context):"
-            current_events = [e for e in timeline if e.get('priority') == 'current']
-            context_events = [e for e in timeline if e.get('priority') == 'context']
-            
-            prompt += f"\n\n🔥 CURRENT ACTIVITY (last 5 minutes - window events only):"
-            app_events = [e for e in current_events if e['type'] == 'app']
-            for i, event in enumerate(app_events):
-                duration = event.get('duration_minutes', 0)
-                timeframe = event.get('timeframe_source', 'unknown')
-                
-                prompt += f"\n  {i+1}. [{duration:.1f}min] {event['name']}"
-                if event.get('title'):
-                    prompt += f" - {event['title'][:60]}"
-            
-            if context_events:
-                prompt += f"\n\n📊 HISTORICAL CONTEXT (significant app activities from longer timeframes):"
-                app_context_events = [e for e in context_events if e['type'] == 'app']
-                for i, event in enumerate(app_context_events[:15]):  # Limit context display, apps only
-                    duration = event.get('duration_minutes', 0)
-                    timeframe = event.get('timeframe_source', 'unknown')
-                    
-                    prompt += f"\n  {i+1}. [{duration:.1f}min] [{timeframe}] {event['name']}"
-        
-        # Add context switches - SHOW ALL SWITCHES
-        if context_switches:
-            prompt += f"\n\n🔄 CONTEXT SWITCHES ({len(context_switches)} total):"
-            for i, switch in enumerate(context_switches):  # ALL switches
-                prompt += f"\n  {i+1}. {switch['from_app']} → {switch['to_app']}"
-        
-        prompt += f"""
-
-🎯 ANALYSIS TASK:
-Based on this raw data, determine the user's current state for ADHD productivity support.
-
-Consider these ADHD-relevant factors:
-1. **Focus Duration**: Long sessions (>15min) in one app suggest flow state
-2. **Context Switching**: Rapid switches may indicate distractibility or task exploration  
-3. **Activity Patterns**: Are they deep in work, browsing, or switching between tasks?
-4. **Productivity Indicators**: Tools like IDEs, documents, vs entertainment/social media
-5. **Time Investment**: Duration spent on different types of activities
-
-🚦 SIMPLIFIED 2-BUCKET ANALYSIS (AFK + WINDOW):
-
-1️⃣ **AFK BUCKET**: 
-   → If currently AFK = true → state = "afk" (ignore everything else)
-
-2️⃣ **WINDOW BUCKET** (focus on current app activity):
-   → Code editor (Code.exe, vim, etc.) → "flow" or "working"
-   → Communication (Weixin.exe, slack) → "working" 
-   → Terminal/PowerShell → "working"
-   → Browser apps → analyze based on context and duration
-   → Entertainment/games → "needs_nudge"
-   → Multiple rapid app switches → "needs_nudge"
-
-⚠️ SIMPLIFIED APPROACH: Focus on window activity patterns only. Web bucket data removed due to timing inaccuracies.
-
-EXAMPLE CORRECT ANALYSIS:
-
-🟢 FLOW STATE: 
-- Current app: "Code.exe" → Extended coding session → "flow"
-- Long duration (>15min) in productive app with minimal switching
-
-🟡 WORKING: 
-- Current app: "Weixin.exe" → Communication/coordination → "working"
-- Current app: "WindowsTerminal.exe" → Development work → "working"
-- Moderate app switching between productive tools
-
-🟠 NEEDS_NUDGE: 
-- Rapid switching between multiple apps in short time
-- Extended time in entertainment/social apps
-- Fragmented attention patterns
-
-🔴 AFK: Currently AFK = true → "afk" (ignore everything else)
-
-✅ SIMPLIFIED ANALYSIS FOCUS:
-- Base decisions on window activity patterns only
-- Consider duration, app types, and switching frequency
-- Ignore web bucket data (removed due to timing inaccuracies)
-
-REQUIRED OUTPUT FORMAT (JSON):
-{{
-  "current_state": "[flow|working|needs_nudge|afk]",
-  "focus_trend": "[maintaining_focus|entering_focus|losing_focus|variable|none]", 
-  "distraction_trend": "[low|moderate|increasing|decreasing|high]",
-  "confidence": "[high|medium|low]",
-  "primary_activity": "[brief description]",
-  "reasoning": "[2-3 sentence explanation of the analysis]"
-}}
-
-Analyze the data and respond with ONLY the JSON object above."""
-        
-        return prompt
-    
-    def _format_patterns_for_prompt(self, patterns: Dict) -> str:
-        """Format cross-timeframe patterns for LLM prompt"""
-        if not patterns:
-            return "No pattern data available"
-        
-        formatted = []
-        formatted.append(f"- Productivity trend: {patterns.get('productivity_trend', 'unknown')}")
-        formatted.append(f"- Web browsing behavior: {patterns.get('web_browsing_behavior', 'unknown')}")
-        
-        # Add dominant apps by timeframe
-        dom_apps = patterns.get('dominant_apps_by_timeframe', {})
-        if dom_apps:
-            formatted.append("- Dominant apps by timeframe:")
-            for timeframe, apps in dom_apps.items():
-                if apps:
-                    formatted.append(f"  • {timeframe}: {', '.join(apps[:3])}")
-        
-        return '\n'.join(formatted)
+        return f"Activity data:\n{_json_dumps(activity).decode('utf-8')}\n\nRespond with ONLY the JSON object."
     
     def _parse_llm_state_analysis(self, llm_response: str) -> Optional[Dict]:
         """Parse the structured LLM response for state analysis"""
         try:
-            import json
-            
-            # Try to extract JSON from the response
-            # Look for JSON-like content between curly braces
-            start_idx = llm_response.find('{')
-            end_idx = llm_response.rfind('}') + 1
+            # Extract the first complete JSON object, ignoring any prose around it
+            json_str = _extract_first_json_object(llm_response)
             
-            if start_idx >= 0 and end_idx > start_idx:
-                json_str = llm_response[start_idx:end_idx]
-                parsed = json.loads(json_str)
+            if json_str:
+                parsed = _json_loads(json_str)
                 
                 # Validate required fields
-                required_fields = ['current_state', 'focus_trend', 'distraction_trend']
-                if all(field in parsed for field in required_fields):
+                if all(field in parsed for field in _REQUIRED_STATE_FIELDS):
                     # Validate state values
-                    valid_states = ['flow', 'working', 'needs_nudge', 'afk']
-                    valid_focus_trends = ['maintaining_focus', 'entering_focus', 'losing_focus', 'variable', 'none']
-                    valid_distraction_trends = ['low', 'moderate', 'increasing', 'decreasing', 'high']
-                    
-                    if (parsed['current_state'] in valid_states and
-                        parsed['focus_trend'] in valid_focus_trends and
-                        parsed['distraction_trend'] in valid_distraction_trends):
+                    if (parsed['current_state'] in _VALID_STATES and
+                        parsed['focus_trend'] in _VALID_FOCUS_TRENDS and
+                        parsed['distraction_trend'] in _VALID_DISTRACTION_TRENDS):
                         return parsed
                     
-        except (json.JSONDecodeError, KeyError, IndexError) as e:
+        except (ValueError, KeyError, IndexError, TypeError) as e:
             logger.debug(f"Error parsing LLM state analysis: {e}")
         
         return None
@@ -516,21 +877,23 @@ Analyze the data and respond with ONLY the JSON object above."""
             'reasoning': 'Fallback analysis based on simple activity metrics.'
         }
 
-    def check_activity(self):
-        """Check current activity and respond if appropriate"""
+    def check_activity(self, now: Optional[datetime] = None):
+        """Check current activity and respond if appropriate. `now` is the tick's UTC time (defaults to the current time)"""
         try:
+            now = now or datetime.now(timezone.utc)
+            
             if self.verbose:
-                print(f"\n📊 ACTIVITY CHECK - {datetime.now().strftime('%m-%d %H:%M:%S')}")
-                print("-" * 50)
+                verbose_log.debug(f"\n📊 ACTIVITY CHECK - {now.astimezone().strftime('%m-%d %H:%M:%S')}")
+                verbose_log.debug("-" * 50)
             
             # Get multi-timeframe data
             multi_timeframe_data = self.aw_client.get_multi_timeframe_data()
             
             if self.verbose:
-                print("📈 Multi-timeframe data collected:")
+                verbose_log.debug("📈 Multi-timeframe data collected:")
                 for timeframe, data in multi_timeframe_data.items():
                     total_events = sum(len(events) for events in data.values())
-                    print(f"  {timeframe}: {total_events} total events")
+                    verbose_log.debug(f"  {timeframe}: {total_events} total events")
             
             # Use LLM to analyze raw data and determine user state
             llm_analysis = self.analyze_user_state_with_llm(multi_timeframe_data)
@@ -543,22 +906,25 @@ Analyze the data and respond with ONLY the JSON object above."""
             logger.info(f"LLM-determined user state: {user_state} (confidence: {llm_analysis.get('confidence', 'unknown')})")
             
             if self.verbose:
-                print(f"\n🎯 LLM ANALYSIS RESULTS:")
-                print(f"  Current State: {user_state}")
-                print(f"  Focus Trend: {focus_trend}")
-                print(f"  Distraction Trend: {distraction_trend}")
-                print(f"  Confidence: {llm_analysis.get('confidence', 'unknown')}")
-                print(f"  Primary Activity: {llm_analysis.get('primary_activity', 'Unknown')}")
-                print(f"  Reasoning: {llm_analysis.get('reasoning', 'No reasoning provided')}")
-            
-            # Still maintain legacy summaries for compatibility with other features
-            summaries = self.event_processor.filter_and_summarize_data(multi_timeframe_data)
+                verbose_log.debug(f"\n🎯 LLM ANALYSIS RESULTS:")
+                verbose_log.debug(f"  Current State: {user_state}")
+                verbose_log.debug(f"  Focus Trend: {focus_trend}")
+                verbose_log.debug(f"  Distraction Trend: {distraction_trend}")
+                verbose_log.debug(f"  Confidence: {llm_analysis.get('confidence', 'unknown')}")
+                verbose_log.debug(f"  Primary Activity: {llm_analysis.get('primary_activity', 'Unknown')}")
+                verbose_log.debug(f"  Reasoning: {llm_analysis.get('reasoning', 'No reasoning provided')}")
+            
+            # Still maintain legacy summaries for compatibility with other features. Only the
+            # 5-minute one is read, so the longer timeframes (up to all of today) aren't re-summarized
+            summaries = self.event_processor.filter_and_summarize_data(
+                {'5_minutes': multi_timeframe_data.get('5_minutes', {'window': [], 'web': [], 'afk': []})}
+            )
             
             # Create a context string for the intervention prompt
             context = f"Primary activity: {llm_analysis.get('primary_activity', 'Unknown')}. {llm_analysis.get('reasoning', '')}"
             
             # Log 5-minute activity summary (every 5 minutes regardless of intervention)
-            self.log_activity_summary(llm_analysis, multi_timeframe_data)
+            self.log_activity_summary(llm_analysis, multi_timeframe_data, now)
             
             # Update daily stats
             five_min_summary = summaries.get('5_minutes', {})
@@ -571,26 +937,30 @@ Analyze the data and respond with ONLY the JSON object above."""
             should_intervene = self.should_intervene(user_state)
             
             if self.verbose:
-                time_since_last = (datetime.now(timezone.utc) - self.last_intervention).total_seconds() / 60
+                time_since_last = (time.monotonic() - self._last_intervention_mono) / 60
                 cooldown = self.intervention_cooldown.get(user_state, 15)
-                print(f"\n⏰ Intervention Decision:")
-                print(f"  Should intervene: {should_intervene}")
-                print(f"  Time since last: {time_since_last:.1f} min")
-                print(f"  Cooldown for {user_state}: {cooldown} min")
-                print(f"  Mode: {self.mode}")
+                verbose_log.debug(f"\n⏰ Intervention Decision:")
+                verbose_log.debug(f"  Should intervene: {should_intervene}")
+                verbose_log.debug(f"  Time since last: {time_since_last:.1f} min")
+                verbose_log.debug(f"  Cooldown for {user_state}: {cooldown} min")
+                verbose_log.debug(f"  Mode: {self.mode}")
             
             if not should_intervene:
                 if self.verbose:
-                    print("  ❌ Skipping intervention")
+                    verbose_log.debug("  ❌ Skipping intervention")
                 logger.debug(f"Skipping intervention for {user_state} state")
                 return
             
             if self.verbose:
-                print("  ✅ Proceeding with intervention")
+                verbose_log.debug("  ✅ Proceeding with intervention")
             
             # Get appropriate prompt
             prompt = self.event_processor.generate_adhd_prompt(user_state, context)
             
+            # Write out the buffered check diagnostics first: get_llm_response prints its
+            # request and response directly, and they belong after the decision above
+            self._flush_verbose()
+            
             # Get response from LLM
             response = self.get_llm_response(prompt, user_state)
             
@@ -600,20 +970,28 @@ Analyze the data and respond with ONLY the JSON object above."""
             # Intervention recorded (5-minute logging handles activity tracking)
             
             # Update intervention tracking
-            self.last_intervention = datetime.now(timezone.utc)
+            self._last_intervention_mono = time.monotonic()
             self.daily_stats['interventions'] += 1
             
         except Exception as e:
             logger.error(f"Error checking activity: {e}", exc_info=True)
+        finally:
+            self._flush_verbose()
 
-    def log_activity_summary(self, llm_analysis: Dict, multi_timeframe_data: Dict):
-        """Log 5-minute activity summary to log.json"""
+    def _flush_verbose(self):
+        """Write out buffered verbose diagnostics"""
+        if self._verbose_handler is not None:
+            self._verbose_handler.flush()
+
+    def log_activity_summary(self, llm_analysis: Dict, multi_timeframe_data: Dict, now: Optional[datetime] = None):
+        """Log 5-minute activity summary to log.jsonl"""
         try:
             # Only log every 5 minutes to avoid spam
-            now = datetime.now(timezone.utc)
-            time_since_last_log = (now - self.last_activity_log).total_seconds() / 60
+            now_mono = time.monotonic()
             
-            if time_since_last_log >= 5.0:  # 5 minutes
+            if now_mono - self._last_activity_log_mono >= 300:  # 5 minutes
+                now = now or datetime.now(timezone.utc)
+                
                 # Extract key activity data
                 recent_data = multi_timeframe_data.get('5_minutes', {})
                 window_events = recent_data.get('window', [])
@@ -645,237 +1023,270 @@ Analyze the data and respond with ONLY the JSON object above."""
                     }
                 }
                 
-                # Load existing log
-                log_entries = []
-                if self.log_file.exists():
-                    try:
-                        with open(self.log_file, 'r') as f:
-                            log_entries = json.load(f)
-                    except:
-                        log_entries = []
-                
-                # Add new entry
-                log_entries.append(log_entry)
-                
-                # Keep last 7 days of 5-minute logs (7 * 24 * 12 = 2016 entries)
-                if len(log_entries) > 2016:
-                    log_entries = log_entries[-2016:]
+                self._append_activity_log(log_entry)
                 
-                # Save log
-                with open(self.log_file, 'w') as f:
-                    json.dump(log_entries, f, indent=2)
-                
-                self.last_activity_log = now
+                self._last_activity_log_mono = now_mono
                 
                 if self.verbose:
-                    print(f"📝 Activity logged: {llm_analysis.get('current_state')} - {llm_analysis.get('primary_activity', 'Unknown')}")
+                    verbose_log.debug(f"📝 Activity logged: {llm_analysis.get('current_state')} - {llm_analysis.get('primary_activity', 'Unknown')}")
                     
         except Exception as e:
             logger.error(f"Error logging activity summary: {e}")
 
-    def generate_thirty_minute_summary(self):
-        """Generate 30-minute summary with brief activities and context switches"""
-        try:
-            now = datetime.now()
-            # Check if we have any activity in the last 30 minutes
-            multi_timeframe_data = self.aw_client.get_multi_timeframe_data()
-            thirty_min_data = multi_timeframe_data.get('30_minutes', {})
-            
-            if not thirty_min_data or not thirty_min_data.get('window_events'):
-                # No activity to summarize
-                return
-                
-            # Create LLM prompt for 30-minute summary
-            window_events = thirty_min_data.get('window_events', [])
-            web_events = thirty_min_data.get('web_events', [])
-            stats = thirty_min_data.get('statistics', {})
-            
-            # Create brief activity list
-            app_durations = {}
-            for event in window_events:
-                app = event.get('app', 'Unknown')
-                duration = event.get('duration_minutes', 0)
-                app_durations[app] = app_durations.get(app, 0) + duration
-            
-            top_apps = sorted(app_durations.items(), key=lambda x: x[1], reverse=True)[:5]
-            
-            web_domains = {}
-            for event in web_events:
-                domain = event.get('domain', 'Unknown')
-                duration = event.get('duration_minutes', 0)
-                web_domains[domain] = web_domains.get(domain, 0) + duration
-            
-            top_websites = sorted(web_domains.items(), key=lambda x: x[1], reverse=True)[:3]
+    def _append_activity_log(self, log_entry: Dict):
+        """Queue one entry for the activity log writer; never blocks on disk I/O"""
+        if self._log_writer_thread is None:
+            self._log_writer_thread = threading.Thread(target=self._log_writer, name="activity-log-writer", daemon=True)
+            self._log_writer_thread.start()
+        self._log_queue.put((datetime.now().date(), log_entry))
+
+    def _log_writer(self):
+        """Drain the log queue, writing everything queued so far in one write()"""
+        while True:
+            batch = [self._log_queue.get()]
+            while True:
+                try:
+                    batch.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
             
-            prompt = f"""Create a brief 30-minute activity summary for this ADHD user.
+            try:
+                self._write_activity_batch(batch)
+            except Exception as e:
+                logger.error(f"Error writing activity log: {e}")
+            finally:
+                for _ in batch:
+                    self._log_queue.task_done()
+
+    def _write_activity_batch(self, batch: List):
+        """Write queued (day, entry) pairs, rotating the log whenever the day changes"""
+        lines = []
+        for day, log_entry in batch:
+            if self._log_fp is None or self._log_day != day:
+                self._write_activity_lines(lines)
+                lines = []
+                self._open_activity_log(day)
+            lines.append(_json_dumps(log_entry) + b"\n")
+        self._write_activity_lines(lines)
+
+    def _open_activity_log(self, day):
+        """Open the activity log for appending, rotating out a file from an earlier day first"""
+        if self._log_fp is None:
+            # Pick up where a previous run left off, rotating first if that file is from an earlier day
+            try:
+                self._log_day = datetime.fromtimestamp(self.log_file.stat().st_mtime).date()
+            except FileNotFoundError:
+                pass
+            else:
+                if self._log_day != day:
+                    self._rotate_activity_log()
+        else:
+            self._rotate_activity_log()
+        
+        self._log_fp = open(self.log_file, 'ab')
+        self._log_day = day
+        self._terminate_partial_line()
 
-📊 30-MINUTE PERIOD: {now.strftime('%H:%M')} to {(now - timedelta(minutes=30)).strftime('%H:%M')}
+    def _write_activity_lines(self, lines: List[bytes]):
+        """Write a run of encoded entries to the open log in a single syscall (no fsync; losing
+        the last few minutes of telemetry on a power cut is acceptable)"""
+        if not lines:
+            return
+        self._log_fp.write(b"".join(lines))
+        self._log_fp.flush()
 
-🖥️ TOP APPLICATIONS:
-{chr(10).join([f"• {app}: {duration:.1f} min" for app, duration in top_apps])}
+    def _terminate_partial_line(self):
+        """If a crash left a torn last line in the log, end it so new entries start on their own line"""
+        size = self.log_file.stat().st_size
+        if not size:
+            return
+        with open(self.log_file, 'rb') as f:
+            f.seek(size - 1)
+            if f.read(1) != b"\n":
+                self._log_fp.write(b"\n")
 
-🌐 TOP WEBSITES:
-{chr(10).join([f"• {domain}: {duration:.1f} min" for domain, duration in top_websites])}
+    def _flush_activity_log(self):
+        """Wait for the writer thread to persist every queued activity log entry"""
+        self._log_queue.join()
 
-📈 STATISTICS:
-• Total active time: {stats.get('total_active_minutes', 0):.1f} minutes
-• Context switches: {stats.get('context_switches', 0)}
-• Unique apps used: {len(stats.get('unique_apps', []))}
+    def _rotate_activity_log(self):
+        """Gzip the current activity log as log-YYYY-MM-DD.jsonl.gz and drop ones past retention"""
+        if self._log_fp is not None:
+            self._log_fp.close()
+            self._log_fp = None
+        
+        archive = self.data_dir / f"log-{self._log_day.isoformat()}.jsonl.gz"
+        with open(self.log_file, 'rb') as src, gzip.open(archive, 'ab') as dst:
+            shutil.copyfileobj(src, dst)
+        self.log_file.unlink()
+        
+        # Archive names sort by date, so everything before the newest N is expired
+        archives = sorted(self.data_dir.glob("log-*.jsonl.gz"))
+        for old in archives[:-self.log_retention_days]:
+            old.unlink()
 
-Create a practical 2-3 sentence summary focusing on:
-- Main tasks/activities accomplished
-- Overall productivity pattern
-- Brief mention of context switching if high
+    def _flush_logs(self):
+        """Flush all buffered log data on exit"""
+        self._flush_hourly_ring()
+        self._flush_activity_log()
 
-Keep it factual and practical, under 100 words."""
 
-            system_prompt = "You are a productivity analyst creating brief 30-minute summaries. Be practical and factual."
-            
-            request_data = {
-                "model": self.model,
-                "prompt": prompt,
-                "system": system_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.5,
-                    "num_predict": 100,
-                    "num_ctx": 8192,
-                    "top_k": 40,
-                    "top_p": 0.9
-                }
-            }
+    def generate_thirty_minute_summary(self):
+        """Record the last 30 minutes' activity (active time, switches, top apps and sites) for the daily summary"""
+        try:
+            now = datetime.now()
+            # Check if we have any activity in the last 30 minutes
+            multi_timeframe_data = self.aw_client.get_multi_timeframe_data()
+            thirty_min_data = multi_timeframe_data.get('30_minutes', {})
             
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json=request_data,
-                timeout=20
-            )
+            # Aggregate the raw bucket events in one pass each, skipping sub-5-second events and
+            # counting switches the same way prepare_raw_data_for_llm does
+            app_durations = Counter()
+            unique_apps = set()
+            context_switches = 0
+            last_app = None
+            for event in thirty_min_data.get('window', []):
+                duration = event.get('duration', 0) / 60
+                app = event.get('data', _EMPTY).get('app', '').strip()
+                if duration < 0.08 or not app:
+                    continue
+                app_durations[app] += duration
+                app_key = app.lower()
+                unique_apps.add(app_key)
+                if last_app and last_app != app_key:
+                    context_switches += 1
+                last_app = app_key
+            
+            if not app_durations:
+                # No activity to summarize
+                return
             
-            summary_text = "30-minute period with activity detected"
-            if response.status_code == 200:
-                result = response.json()
-                summary_text = result.get("response", "").strip()
+            extract_domain = self.event_processor._extract_domain
+            web_domains = Counter()
+            for event in thirty_min_data.get('web', []):
+                url = event.get('data', _EMPTY).get('url', '')
+                if url:
+                    web_domains[extract_domain(url) or 'Unknown'] += event.get('duration', 0) / 60
             
-            # Store for daily summary use
+            # Record aggregates only; the 4am daily summary writes every period's summary in one LLM call.
+            # most_common(k) is a heapq.nlargest, not a full sort
             thirty_min_summary = {
                 "timestamp": now.isoformat(),
                 "period": f"{(now - timedelta(minutes=30)).strftime('%H:%M')}-{now.strftime('%H:%M')}",
-                "summary": summary_text,
+                "summary": "",
                 "stats": {
-                    "active_minutes": stats.get('total_active_minutes', 0),
-                    "context_switches": stats.get('context_switches', 0),
-                    "top_apps": [app for app, _ in top_apps[:3]],
-                    "top_websites": [domain for domain, _ in top_websites[:2]]
+                    "active_minutes": round(sum(app_durations.values()), 1),
+                    "context_switches": context_switches,
+                    "unique_apps": len(unique_apps),
+                    "top_apps": {app: round(minutes, 1) for app, minutes in app_durations.most_common(5)},
+                    "top_websites": {domain: round(minutes, 1) for domain, minutes in web_domains.most_common(3)}
                 }
             }
-            
-            # Add to daily summary data (stored in memory for now, will be written to daily summary)
-            if not hasattr(self, '_thirty_min_summaries'):
-                self._thirty_min_summaries = []
             self._thirty_min_summaries.append(thirty_min_summary)
             
             if self.verbose:
-                print(f"\n⏰ 30-MIN SUMMARY ({thirty_min_summary['period']}): {summary_text}")
+                stats = thirty_min_summary['stats']
+                print(f"\n⏰ 30-MIN PERIOD ({thirty_min_summary['period']}): {stats['active_minutes']} min active, "
+                      f"{stats['context_switches']} switches, top apps: {', '.join(stats['top_apps'])}")
                 
         except Exception as e:
             logger.error(f"Error generating 30-minute summary: {e}")
 
-    def generate_daily_summary(self):
+    def _run_in_background(self, job: Callable, *args):
+        """Queue a scheduled summary on the summary worker so the main loop never waits on Ollama"""
+        if self._summary_executor is None:
+            self._summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="summary")
+        self._summary_executor.submit(job, *args)
+
+    def _start_new_day(self):
+        """Take today's 30-minute summaries and stats, and start the new day's (main loop only)"""
+        today_summaries, daily_stats = self._thirty_min_summaries, self.daily_stats
+        if today_summaries:
+            # Interventions counted while the daily summary is generated land in the new day
+            self._thirty_min_summaries = []
+            self.daily_stats = {'focus_sessions': 0, 'distractions': 0, 'interventions': 0}
+        return today_summaries, dict(daily_stats)
+
+    def generate_daily_summary(self, today_summaries: List[Dict], daily_stats: Dict):
         """Generate practical daily summary at 4am with 30-minute periods"""
         try:
             print("\n" + "=" * 60)
             print("🌅 Daily Summary (4am)")
             print("=" * 60)
             
-            # Get all 30-minute summaries from today
-            today_summaries = getattr(self, '_thirty_min_summaries', [])
-            
             if not today_summaries:
                 print("No activity summaries available for today.")
                 return
             
             # Create comprehensive daily summary prompt
+            period_lines = "\n".join(self._format_thirty_minute_period(summary) for summary in today_summaries)
             prompt = f"""Create a practical daily summary for this ADHD user.
 
 📅 DATE: {datetime.now().strftime('%A, %B %d, %Y')}
 
-📊 30-MINUTE PERIOD SUMMARIES:
-{chr(10).join([f"• {summary['period']}: {summary['summary']}" for summary in today_summaries])}
+📊 30-MINUTE PERIODS (active minutes, context switches, top apps and websites in minutes):
+{period_lines}
 
 📈 DAILY STATISTICS:
 • Total 30-minute periods: {len(today_summaries)}
-• Total interventions: {self.daily_stats.get('interventions', 0)}
+• Total interventions: {daily_stats.get('interventions', 0)}
 
-Create a practical daily summary that includes:
-1. **Main Tasks Accomplished**: What did they actually get done today?
-2. **Activity Patterns**: General productivity patterns and work style
-3. **Key Achievements**: Specific accomplishments worth noting
-4. **Brief Overview**: Overall assessment of the day
+Respond with a JSON object with two fields:
+- "periods": an array with one brief, factual sentence per period above, in the same order, saying what the user was doing
+- "summary": a practical daily summary that includes:
+  1. **Main Tasks Accomplished**: What did they actually get done today?
+  2. **Activity Patterns**: General productivity patterns and work style
+  3. **Key Achievements**: Specific accomplishments worth noting
+  4. **Brief Overview**: Overall assessment of the day
+  Use a practical, matter-of-fact tone. Focus on concrete achievements and observable patterns.
+  Keep it under 200 words and use clear sections."""
 
-Use a practical, matter-of-fact tone. Focus on concrete achievements and observable patterns.
-Keep it under 200 words and use clear sections."""
-
-            system_prompt = "You are a productivity analyst creating daily work summaries. Be practical, factual, and focus on accomplishments."
+            system_prompt = _DAILY_WORK_SYSTEM_PROMPT
+            num_predict = 250 + 40 * len(today_summaries)  # Day summary plus a sentence per period
             
             request_data = {
                 "model": self.model,
                 "prompt": prompt,
                 "system": system_prompt,
                 "stream": False,
+                "format": "json",
                 "options": {
-                    "temperature": 0.6,
-                    "num_predict": 250,
-                    "num_ctx": 8192,
-                    "top_k": 40,
-                    "top_p": 0.9
+                    **_LLM_OPTIONS["daily_work"],
+                    "num_predict": num_predict,
+                    "num_ctx": _context_size(system_prompt, prompt, num_predict=num_predict)
                 }
             }
             
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json=request_data,
-                timeout=30
+            # One long generation replaces the day's per-period calls, so allow it more time
+            response = self.http.post(
+                self._generate_url,
+                data=_json_dumps(request_data),
+                headers=_JSON_HEADERS,
+                timeout=180
             )
             
             daily_summary_text = "Daily activity summary generated"
             if response.status_code == 200:
-                result = response.json()
-                daily_summary_text = result.get("response", "").strip()
+                result = _json_loads(response.content)
+                daily_summary_text = (
+                    self._apply_daily_batch_response(result.get("response", ""), today_summaries)
+                    or daily_summary_text
+                )
             
             print(daily_summary_text)
             
             # Save daily summary
+            now = datetime.now()
             daily_summary = {
-                "date": datetime.now().date().isoformat(),
+                "date": now.date().isoformat(),
                 "summary": daily_summary_text,
                 "thirty_minute_periods": today_summaries,
-                "daily_stats": self.daily_stats.copy(),
-                "generated_at": datetime.now().isoformat()
+                "daily_stats": daily_stats,
+                "generated_at": now.isoformat()
             }
             
-            # Load existing daily summaries
-            daily_summaries = []
-            if self.daily_summary_file.exists():
-                try:
-                    with open(self.daily_summary_file, 'r') as f:
-                        daily_summaries = json.load(f)
-                except:
-                    daily_summaries = []
-            
-            # Add new summary
-            daily_summaries.append(daily_summary)
-            
-            # Keep last 30 days
-            if len(daily_summaries) > 30:
-                daily_summaries = daily_summaries[-30:]
-            
-            # Save daily summaries
-            with open(self.daily_summary_file, 'w') as f:
-                json.dump(daily_summaries, f, indent=2)
-            
-            # Reset for new day
-            self._thirty_min_summaries = []
-            self.daily_stats = {'focus_sessions': 0, 'distractions': 0, 'interventions': 0}
+            # Save daily summaries, keeping the last 30 days
+            self._append_json_history(self.daily_summary_file, daily_summary, keep=30)
             
             print("=" * 60 + "\n")
             
@@ -883,16 +1294,48 @@ Keep it under 200 words and use clear sections."""
             logger.error(f"Error generating daily summary: {e}")
             print("Had trouble generating daily summary, but your productivity continues! 📈")
     
+    def _format_thirty_minute_period(self, summary: Dict) -> str:
+        """One prompt line for a recorded 30-minute period"""
+        stats = summary['stats']
+        apps = ", ".join(f"{app} {minutes}" for app, minutes in stats.get('top_apps', {}).items())
+        line = (f"• {summary['period']}: {stats.get('active_minutes', 0)} min active, "
+                f"{stats.get('context_switches', 0)} switches; apps: {apps or 'none'}")
+        websites = stats.get('top_websites')
+        if websites:
+            line += "; sites: " + ", ".join(f"{domain} {minutes}" for domain, minutes in websites.items())
+        return line
+
+    def _apply_daily_batch_response(self, text: str, today_summaries: List[Dict]) -> Optional[str]:
+        """Fill in each period's summary from the batched daily answer and return the day summary.
+        Returns None if the answer isn't the requested JSON (e.g. cut off by num_predict)."""
+        json_text = _extract_first_json_object(text)
+        try:
+            result = _json_loads(json_text) if json_text else None
+        except ValueError:
+            result = None
+        if not isinstance(result, dict) or not isinstance(result.get('summary'), str):
+            logger.warning("Daily summary response was not the requested JSON, using the fallback summary")
+            return None
+        
+        periods = result.get('periods')
+        if isinstance(periods, list):
+            if len(periods) == len(today_summaries):
+                for record, period_text in zip(today_summaries, periods):
+                    record['summary'] = str(period_text).strip()
+            else:
+                # No way to tell which sentence belongs to which period, so leave them all unset
+                logger.warning(f"Daily summary returned {len(periods)} period summaries for "
+                               f"{len(today_summaries)} periods, not applying them")
+        return result['summary'].strip() or None
+    
     def should_intervene(self, user_state: str) -> bool:
         """Determine if we should intervene based on state and mode"""
         if self.mode == "ghost":
             return False
         
-        # Check cooldown
-        time_since_last = (datetime.now(timezone.utc) - self.last_intervention).total_seconds() / 60
-        cooldown = self.intervention_cooldown.get(user_state, 15)
-        
-        if time_since_last < cooldown:
+        # Check cooldown (it depends on the current state, so compare elapsed time rather than a fixed deadline)
+        cooldown_seconds = self.intervention_cooldown.get(user_state, 15) * 60
+        if time.monotonic() - self._last_intervention_mono < cooldown_seconds:
             return False
         
         # Mode-specific logic
@@ -908,17 +1351,14 @@ Keep it under 200 words and use clear sections."""
     def get_llm_response(self, prompt: str, user_state: str) -> str:
         """Get response from Ollama LLM"""
         try:
-            system_prompt = "You are a supportive ADHD companion. Be encouraging, never judgmental. Keep responses very concise."
+            system_prompt = _COMPANION_SYSTEM_PROMPT
             
             request_data = {
                 "model": self.model,
                 "prompt": prompt,
                 "system": system_prompt,
                 "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "num_predict": 50  # Limit response length
-                }
+                "options": dict(_LLM_OPTIONS["companion"])
             }
             
             if self.verbose:
@@ -930,14 +1370,15 @@ Keep it under 200 words and use clear sections."""
                 print(f"Prompt:\n{prompt}")
                 print(f"{'='*60}")
             
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json=request_data,
+            response = self.http.post(
+                self._generate_url,
+                data=_json_dumps(request_data),
+                headers=_JSON_HEADERS,
                 timeout=10
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = _json_loads(response.content)
                 llm_response = result.get("response", "").strip()
                 
                 if self.verbose:
@@ -986,7 +1427,7 @@ Keep it under 200 words and use clear sections."""
         interaction = {
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "state": state,
-            "response": response,
+            "response": response[:200],  # Prompts only ever show the first 100 characters
             "mode": self.mode,
             "activity_summary": {
                 "current_behavior": summaries.get('5_minutes', {}).get('behavior_pattern', ''),
@@ -997,25 +1438,8 @@ Keep it under 200 words and use clear sections."""
             }
         }
         
-        # Load existing interactions
-        interactions = []
-        if self.interactions_file.exists():
-            try:
-                with open(self.interactions_file, 'r') as f:
-                    interactions = json.load(f)
-            except:
-                interactions = []
-        
-        # Add new interaction
-        interactions.append(interaction)
-        
         # Keep only last 1000 interactions
-        if len(interactions) > 1000:
-            interactions = interactions[-1000:]
-        
-        # Save back
-        with open(self.interactions_file, 'w') as f:
-            json.dump(interactions, f, indent=2)
+        self._append_json_history(self.interactions_file, interaction, keep=1000)
     
     def generate_end_of_day_summary(self):
         """Generate and display end of day summary using LLM"""
@@ -1040,31 +1464,7 @@ Keep it under 200 words and use clear sections."""
                 self._show_basic_summary(summary_data)
             
             # Save the summary data
-            try:
-                summary_to_save = {
-                    "date": datetime.now().date().isoformat(),
-                    "llm_summary": llm_summary if llm_summary else "LLM unavailable",
-                    "session_data": summary_data,
-                    "companion_active": True
-                }
-                
-                summaries = []
-                if self.daily_summaries_file.exists():
-                    try:
-                        with open(self.daily_summaries_file, 'r') as f:
-                            summaries = json.load(f)
-                    except:
-                        summaries = []
-                
-                summaries.append(summary_to_save)
-                if len(summaries) > 30:
-                    summaries = summaries[-30:]
-                
-                with open(self.daily_summaries_file, 'w') as f:
-                    json.dump(summaries, f, indent=2)
-                    
-            except Exception as e:
-                logger.error(f"Error saving daily summary: {e}")
+            self._save_end_of_day_summary(summary_data, llm_summary)
             
         except Exception as e:
             logger.error(f"Error generating daily summary: {e}")
@@ -1078,6 +1478,21 @@ Keep it under 200 words and use clear sections."""
         
         print("=" * 60 + "\n")
     
+    def _save_end_of_day_summary(self, summary_data: Dict, llm_summary: Optional[str]):
+        """Append an end-of-day summary to the daily summaries file"""
+        try:
+            summary_to_save = {
+                "date": datetime.now().date().isoformat(),
+                "llm_summary": llm_summary if llm_summary else "LLM unavailable",
+                "session_data": summary_data,
+                "companion_active": True
+            }
+            
+            self._append_json_history(self.daily_summaries_file, summary_to_save, keep=30)
+                
+        except Exception as e:
+            logger.error(f"Error saving daily summary: {e}")
+    
     def _collect_summary_data(self) -> Dict:
         """Collect comprehensive data for daily summary"""
         summary_data = {
@@ -1098,18 +1513,20 @@ Keep it under 200 words and use clear sections."""
         
         # Get recent interactions from file
         try:
-            if self.interactions_file.exists():
-                with open(self.interactions_file, 'r') as f:
-                    all_interactions = json.load(f)
-                    
-                # Get today's interactions
-                today = datetime.now().date().isoformat()
-                today_interactions = [
-                    i for i in all_interactions 
-                    if i.get('timestamp', '').startswith(today)
-                ]
+            all_interactions = self._load_json_history(self.interactions_file)
                 
-                summary_data['interactions'] = today_interactions[-10:]  # Last 10 interactions
+            # Interactions are appended in time order, so today's are a suffix of the
+            # history; walk it backwards and stop at the last 10 or the first older entry
+            today = datetime.now().date().isoformat()
+            today_interactions = []
+            for interaction in reversed(all_interactions):
+                if len(today_interactions) == 10 or not interaction.get('timestamp', '').startswith(today):
+                    break
+                today_interactions.append(interaction)
+            
+            summary_data['interactions'] = today_interactions[::-1]  # Last 10 interactions
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.error(f"Error loading interactions: {e}")
         
@@ -1120,29 +1537,24 @@ Keep it under 200 words and use clear sections."""
             web_events = self.aw_client.get_web_events(hours_back=0.5)
             
             if window_events:
-                # Extract top apps from recent activity
-                app_counts = {}
-                for event in window_events[-20:]:  # Last 20 events only
-                    app = event.get('data', {}).get('app', 'Unknown')
-                    app_counts[app] = app_counts.get(app, 0) + 1
+                # Extract top apps from recent activity (last 20 events only)
+                app_counts = Counter(
+                    event.get('data', _EMPTY).get('app', 'Unknown') for event in window_events[-20:]
+                )
                 
                 summary_data['activity_sample'] = {
-                    'recent_apps': list(app_counts.keys())[:5],
+                    'recent_apps': [app for app, _ in app_counts.most_common(5)],
                     'total_recent_events': len(window_events),
                     'has_recent_activity': len(window_events) > 0
                 }
             
             if web_events:
-                # Extract recent websites
-                domains = []
-                for event in web_events[-10:]:  # Last 10 web events
-                    url = event.get('data', {}).get('url', '')
-                    if url:
-                        domain = self.event_processor._extract_domain(url)
-                        if domain not in domains:
-                            domains.append(domain)
+                # Extract recent websites, deduplicated in first-seen order
+                extract_domain = self.event_processor._extract_domain
+                urls = (event.get('data', _EMPTY).get('url', '') for event in web_events[-10:])  # Last 10 web events
+                domains = dict.fromkeys(extract_domain(url) for url in urls if url)
                 
-                summary_data['activity_sample']['recent_websites'] = domains[:3]
+                summary_data['activity_sample']['recent_websites'] = list(islice(domains, 3))
                 
         except Exception as e:
             logger.error(f"Error getting activity sample: {e}")
@@ -1150,6 +1562,12 @@ Keep it under 200 words and use clear sections."""
         
         return summary_data
     
+    def _print_insights_request(self, title: str, label: str, data: Dict):
+        """Verbose dump of an insights request, in one print so concurrent --all-insights requests don't interleave lines"""
+        rule = '=' * 60
+        print(f"\n{rule}\n🧠 {title} LLM REQUEST\n{rule}\n"
+              f"Model: {self.model}\n{label}: {_json_pretty(data)}\n{rule}")
+
     def _generate_llm_daily_summary(self, summary_data: Dict) -> Optional[str]:
         """Generate daily summary using LLM"""
         try:
@@ -1157,17 +1575,10 @@ Keep it under 200 words and use clear sections."""
             prompt = self._create_daily_summary_prompt(summary_data)
             
             if self.verbose:
-                print(f"\n{'='*60}")
-                print(f"🧠 DAILY SUMMARY LLM REQUEST")
-                print(f"{'='*60}")
-                print(f"Model: {self.model}")
-                print(f"Data: {json.dumps(summary_data, indent=2)}")
-                print(f"{'='*60}")
+                self._print_insights_request("DAILY SUMMARY", "Data", summary_data)
             
             # Get LLM response with longer limit for daily summary
-            system_prompt = """You are a supportive ADHD productivity coach creating an end-of-day summary. 
-Be encouraging, celebrate small wins, acknowledge challenges without judgment, and provide gentle insights. 
-Keep the tone warm, personal, and supportive. Focus on progress and patterns, not perfection."""
+            system_prompt = _DAILY_SUMMARY_SYSTEM_PROMPT
             
             request_data = {
                 "model": self.model,
@@ -1175,22 +1586,21 @@ Keep the tone warm, personal, and supportive. Focus on progress and patterns, no
                 "system": system_prompt,
                 "stream": False,
                 "options": {
-                    "temperature": 0.8,
-                    "num_predict": 300,  # Longer response for daily summary
-                    "num_ctx": 8192,     # Use full 8K context window
-                    "top_k": 40,
-                    "top_p": 0.9
-                }
+                    **_LLM_OPTIONS["daily_summary"],
+                    "num_ctx": _context_size(system_prompt, prompt, num_predict=_LLM_OPTIONS["daily_summary"]["num_predict"])
+                },
+                "keep_alive": "10m"
             }
             
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json=request_data,
+            response = self.http.post(
+                self._generate_url,
+                data=_json_dumps(request_data),
+                headers=_JSON_HEADERS,
                 timeout=30  # Longer timeout for daily summary
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = _json_loads(response.content)
                 llm_response = result.get("response", "").strip()
                 
                 if self.verbose:
@@ -1229,47 +1639,30 @@ Keep the tone warm, personal, and supportive. Focus on progress and patterns, no
 💬 INTERACTIONS TODAY: {len(interactions)} total
 """
 
+        # Collect the optional sections and join once at the end
+        parts = [prompt]
+        
         # Add interaction details if available
         if interactions:
-            prompt += "\nRecent companion interactions:\n"
+            parts.append("\nRecent companion interactions:\n")
             for interaction in interactions[-5:]:  # Last 5 interactions
                 state = interaction.get('state', 'unknown')
                 response = interaction.get('response', 'N/A')[:100]  # Truncate long responses
-                prompt += f"- {state}: {response}\n"
+                parts.append(f"- {state}: {response}\n")
         
         # Add activity context if available
         if activity_sample.get('recent_apps'):
-            prompt += f"\n📱 RECENT APPS USED: {', '.join(activity_sample['recent_apps'])}"
+            parts.append(f"\n📱 RECENT APPS USED: {', '.join(activity_sample['recent_apps'])}")
         
         if activity_sample.get('recent_websites'):
-            prompt += f"\n🌐 RECENT WEBSITES: {', '.join(activity_sample['recent_websites'])}"
+            parts.append(f"\n🌐 RECENT WEBSITES: {', '.join(activity_sample['recent_websites'])}")
         
         if activity_sample.get('has_recent_activity'):
-            prompt += f"\n📊 Recent activity events: {activity_sample.get('total_recent_events', 0)}"
+            parts.append(f"\n📊 Recent activity events: {activity_sample.get('total_recent_events', 0)}")
         
-        prompt += f"""
-
-🎯 SUMMARY REQUEST:
-Create a personalized, ADHD-friendly daily summary that:
-
-1. **Celebrates Progress**: Acknowledge what they DID accomplish, however small
-2. **Recognizes Patterns**: Note any interesting productivity patterns or behaviors
-3. **Shows Understanding**: Demonstrate understanding of ADHD challenges and strengths
-4. **Offers Encouragement**: Be genuinely supportive and warm
-5. **Suggests Insights**: Gentle observations about their work style today
-
-IMPORTANT GUIDELINES:
-- Never shame or criticize
-- Celebrate effort over perfection
-- Acknowledge that some days are different than others
-- Be specific about what you observed
-- Keep it under 250 words
-- Use encouraging emojis appropriately
-- End with tomorrow-focused positivity
+        parts.append("\n\nCreate the daily summary.")
 
-Remember: This person chose to use a productivity tool today - that itself shows self-care and intention!"""
-
-        return prompt
+        return "".join(parts)
     
     def _show_basic_summary(self, summary_data: Dict):
         """Show basic summary if LLM is unavailable"""
@@ -1306,9 +1699,7 @@ Remember: This person chose to use a productivity tool today - that itself shows
             # Generate LLM insights
             insights = self._generate_llm_weekly_insights(weekly_data)
             
-            if insights:
-                print(insights)
-            else:
+            if not insights:
                 print("🤖 LLM unavailable for detailed insights.")
                 self._show_basic_weekly_summary(weekly_data)
                 
@@ -1333,69 +1724,67 @@ Remember: This person chose to use a productivity tool today - that itself shows
         
         # Load recent daily summaries
         try:
-            if self.daily_summaries_file.exists():
-                with open(self.daily_summaries_file, 'r') as f:
-                    all_summaries = json.load(f)
-                
-                # Get last 7 days
-                recent_summaries = all_summaries[-7:] if len(all_summaries) >= 7 else all_summaries
-                weekly_data['daily_summaries'] = recent_summaries
-                
-                # Calculate totals
-                for summary in recent_summaries:
-                    session_data = summary.get('session_data', {}).get('session_stats', {})
-                    weekly_data['total_interactions'] += session_data.get('interventions', 0)
-                    weekly_data['total_focus_sessions'] += session_data.get('focus_sessions_detected', 0)
+            all_summaries = self._load_json_history(self.daily_summaries_file)
+            
+            # Get last 7 days; the totals only ever look at this window, never the whole file
+            recent_summaries = all_summaries[-7:]
+            weekly_data['daily_summaries'] = recent_summaries
+            
+            # Calculate totals
+            for summary in recent_summaries:
+                session_data = summary.get('session_data', _EMPTY).get('session_stats', _EMPTY)
+                weekly_data['total_interactions'] += session_data.get('interventions', 0)
+                weekly_data['total_focus_sessions'] += session_data.get('focus_sessions_detected', 0)
                 
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.error(f"Error loading weekly data: {e}")
         
         return weekly_data
     
-    def _generate_llm_weekly_insights(self, weekly_data: Dict) -> Optional[str]:
-        """Generate weekly insights using LLM"""
+    def _generate_llm_weekly_insights(self, weekly_data: Dict, echo: bool = True) -> Optional[str]:
+        """Generate weekly insights using LLM, echoing them to stdout as they stream in if echo is set"""
         try:
             prompt = self._create_weekly_insights_prompt(weekly_data)
             
             if self.verbose:
-                print(f"\n{'='*60}")
-                print(f"🧠 WEEKLY INSIGHTS LLM REQUEST")
-                print(f"{'='*60}")
-                print(f"Model: {self.model}")
-                print(f"Weekly Data: {json.dumps(weekly_data, indent=2)[:500]}...")
-                print(f"{'='*60}")
-            
-            system_prompt = """You are an ADHD productivity coach analyzing weekly patterns. 
-Identify trends, celebrate consistency, acknowledge challenges, and provide gentle insights about productivity patterns. 
-Be encouraging and focus on growth and self-understanding rather than judgment."""
+                weekly_overview = {
+                    'days': len(weekly_data.get('daily_summaries', [])),
+                    'total_interactions': weekly_data.get('total_interactions', 0),
+                    'total_focus_sessions': weekly_data.get('total_focus_sessions', 0),
+                    'week_info': weekly_data.get('week_info', {})
+                }
+                self._print_insights_request("WEEKLY INSIGHTS", "Weekly Data", weekly_overview)
             
             request_data = {
-                "model": self.model,
-                "prompt": prompt,
-                "system": system_prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "num_predict": 400  # Even longer for weekly insights
-                }
+                "model": self.model, "prompt": prompt, **_WEEKLY_REQUEST, "options": dict(_LLM_OPTIONS["weekly"])
             }
             
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json=request_data,
+            response = self.http.post(
+                self._generate_url,
+                data=_json_dumps(request_data),
+                headers=_JSON_HEADERS,
+                stream=True,
                 timeout=45  # Longer timeout for complex analysis
             )
             
             if response.status_code == 200:
-                result = response.json()
-                llm_response = result.get("response", "").strip()
+                try:
+                    llm_response = self._read_streamed_response(response, echo=echo)
+                except StreamInterrupted as e:
+                    # Part of the insights is already on screen; don't follow it with "LLM unavailable"
+                    logger.warning("Weekly insights were cut off")
+                    llm_response = e.partial
                 
                 if self.verbose:
-                    print(f"✅ LLM WEEKLY INSIGHTS: {llm_response}")
+                    if not echo:
+                        print(f"✅ LLM WEEKLY INSIGHTS: {llm_response}")
                     print(f"{'='*60}\n")
                 
                 return llm_response
             else:
+                response.close()
                 logger.warning(f"Ollama returned status {response.status_code}")
                 return None
                 
@@ -1420,41 +1809,23 @@ Be encouraging and focus on growth and self-understanding rather than judgment."
 📋 DAILY BREAKDOWN:
 """
 
-        # Add daily summary info
+        # Add daily summary info, one formatted block per day, joined once at the end
+        parts = [prompt]
         for i, summary in enumerate(summaries, 1):
             date = summary.get('date', f'Day {i}')
-            session_data = summary.get('session_data', {}).get('session_stats', {})
-            
-            prompt += f"Day {i} ({date}):\n"
-            prompt += f"  - Mode: {session_data.get('mode', 'unknown')}\n"
-            prompt += f"  - Interventions: {session_data.get('interventions', 0)}\n"
-            prompt += f"  - Focus sessions: {session_data.get('focus_sessions_detected', 0)}\n"
-            prompt += f"  - Check interval: {session_data.get('check_interval', 60)}s\n"
-        
-        prompt += f"""
-
-🎯 ANALYSIS REQUEST:
-As an ADHD coach, analyze these patterns and provide insights about:
-
-1. **Consistency Patterns**: What does their usage pattern tell us about their routine?
-2. **Productivity Rhythms**: Any trends in focus sessions or engagement levels?
-3. **Growth Observations**: Signs of developing better productivity habits?
-4. **ADHD-Specific Insights**: How their usage patterns reflect common ADHD traits?
-5. **Gentle Recommendations**: Suggestions for optimizing their companion experience?
-
-IMPORTANT GUIDELINES:
-- Celebrate any consistency, even if imperfect
-- Acknowledge that ADHD productivity isn't linear
-- Focus on patterns and insights, not judgments
-- Offer specific, actionable suggestions
-- Keep it encouraging and hopeful
-- Use supportive language throughout
-- Keep response under 350 words
-- Use emojis to make it engaging
-
-Remember: Using a productivity tool consistently shows self-awareness and commitment to growth!"""
-
-        return prompt
+            session_data = summary.get('session_data', _EMPTY).get('session_stats', _EMPTY)
+            
+            parts.append(
+                f"Day {i} ({date}):\n"
+                f"  - Mode: {session_data.get('mode', 'unknown')}\n"
+                f"  - Interventions: {session_data.get('interventions', 0)}\n"
+                f"  - Focus sessions: {session_data.get('focus_sessions_detected', 0)}\n"
+                f"  - Check interval: {session_data.get('check_interval', 60)}s\n"
+            )
+        
+        parts.append("\nCreate the weekly insights.")
+
+        return "".join(parts)
     
     def _show_basic_weekly_summary(self, weekly_data: Dict):
         """Show basic weekly summary if LLM unavailable"""
@@ -1483,32 +1854,14 @@ Remember: Using a productivity tool consistently shows self-awareness and commit
             "interventions": self.daily_stats['interventions']
         }
         
-        # Load existing summaries
-        summaries = []
-        if self.daily_summaries_file.exists():
-            try:
-                with open(self.daily_summaries_file, 'r') as f:
-                    summaries = json.load(f)
-            except:
-                summaries = []
-        
-        # Add new summary
-        summaries.append(summary)
-        
         # Keep last 30 days
-        if len(summaries) > 30:
-            summaries = summaries[-30:]
-        
-        # Save back
-        with open(self.daily_summaries_file, 'w') as f:
-            json.dump(summaries, f, indent=2)
+        self._append_json_history(self.daily_summaries_file, summary, keep=30)
 
     def check_hourly_summary(self):
         """Generate and save hourly activity summaries"""
-        now = datetime.now(timezone.utc)
-        time_since_last_hourly = (now - self.last_hourly_summary).total_seconds() / 3600
+        now_mono = time.monotonic()
         
-        if time_since_last_hourly >= 1.0:  # 1 hour
+        if now_mono - self._last_hourly_mono >= 3600:  # 1 hour
             try:
                 # Get activity data for the last hour
                 multi_timeframe_data = self.aw_client.get_multi_timeframe_data()
@@ -1519,28 +1872,31 @@ Remember: Using a productivity tool consistently shows self-awareness and commit
                     summaries = self.event_processor.filter_and_summarize_data({'1_hour': hourly_data})
                     hour_summary = summaries.get('1_hour', {})
                     
-                    # Generate LLM summary
-                    llm_summary = self._generate_llm_hourly_summary(hour_summary)
+                    # Idle hour - record it without an LLM round-trip
+                    if not hour_summary.get('active_time_minutes') and not hour_summary.get('app_switches'):
+                        self._save_hourly_summary(hour_summary, "Idle hour - no activity")
+                        self._last_hourly_mono = now_mono
+                        return
+                    
+                    if self.verbose:
+                        print(f"\n⏰ HOURLY SUMMARY GENERATED - {datetime.now().strftime('%H:%M')}")
+                    
+                    # Generate LLM summary, printed as it streams in when verbose
+                    llm_summary = self._generate_llm_hourly_summary(hour_summary, echo=self.verbose)
                     
                     # Save to hourly summaries file
                     self._save_hourly_summary(hour_summary, llm_summary)
-                    
-                    if self.verbose:
-                        print(f"\n⏰ HOURLY SUMMARY GENERATED - {now.strftime('%H:%M')}")
-                        if llm_summary:
-                            print(f"📝 {llm_summary}")
                 
-                self.last_hourly_summary = now
+                self._last_hourly_mono = now_mono
                 
             except Exception as e:
                 logger.error(f"Error generating hourly summary: {e}")
 
     def check_minute_summary(self):
         """Generate minute-by-minute summaries in verbose mode"""
-        now = datetime.now(timezone.utc)
-        time_since_last_minute = (now - self.last_minute_summary).total_seconds()
+        now_mono = time.monotonic()
         
-        if time_since_last_minute >= 60:  # 1 minute
+        if now_mono - self._last_minute_mono >= 60:  # 1 minute
             try:
                 # Get recent activity (last 5 minutes)
                 multi_timeframe_data = self.aw_client.get_multi_timeframe_data()
@@ -1552,8 +1908,9 @@ Remember: Using a productivity tool consistently shows self-awareness and commit
                     web_events = recent_data.get('web', [])
                     
                     if window_events:
-                        latest_app = window_events[-1].get('data', {}).get('app', 'Unknown')
-                        latest_title = window_events[-1].get('data', {}).get('title', '')[:50]
+                        latest = window_events[-1].get('data', _EMPTY)
+                        latest_app = latest.get('app', 'Unknown')
+                        latest_title = latest.get('title', '')[:50]
                         
                         summary = f"🕐 Currently: {latest_app}"
                         if latest_title:
@@ -1567,13 +1924,13 @@ Remember: Using a productivity tool consistently shows self-awareness and commit
                         
                         print(f"\n{summary}")
                 
-                self.last_minute_summary = now
+                self._last_minute_mono = now_mono
                 
             except Exception as e:
                 logger.debug(f"Error in minute summary: {e}")
 
-    def _generate_llm_hourly_summary(self, hour_data: Dict) -> Optional[str]:
-        """Generate LLM-powered hourly summary"""
+    def _generate_llm_hourly_summary(self, hour_data: Dict, echo: bool = False) -> Optional[str]:
+        """Generate LLM-powered hourly summary, optionally echoing it as it streams in"""
         try:
             prompt = f"""Please create a brief, encouraging hourly summary for this ADHD user.
 
@@ -1593,31 +1950,30 @@ Create a 1-2 sentence positive summary that:
 
 Focus on progress, not perfection!"""
 
-            system_prompt = "You are a supportive ADHD productivity coach providing brief hourly check-ins. Be warm, encouraging, and focus on small wins."
-            
+            options = _LLM_OPTIONS["hourly"]
             request_data = {
                 "model": self.model,
                 "prompt": prompt,
-                "system": system_prompt,
-                "stream": False,
+                **_HOURLY_REQUEST,
                 "options": {
-                    "temperature": 0.7,
-                    "num_predict": 100,
-                    "num_ctx": 8192,  # Use full 8K context window
-                    "top_k": 40,
-                    "top_p": 0.9
+                    **options, "num_ctx": _context_size(_HOURLY_SYSTEM_PROMPT, prompt, num_predict=options["num_predict"])
                 }
             }
             
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json=request_data,
+            response = self.http.post(
+                self._generate_url,
+                data=_json_dumps(request_data),
+                headers=_JSON_HEADERS,
+                stream=True,
                 timeout=15
             )
             
             if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "").strip()
+                try:
+                    return self._read_streamed_response(response, echo=echo)
+                except StreamInterrupted as e:
+                    return e.partial  # Save what was shown
+            response.close()
             
         except Exception as e:
             logger.debug(f"Error generating hourly LLM summary: {e}")
@@ -1626,10 +1982,12 @@ Focus on progress, not perfection!"""
 
     def _save_hourly_summary(self, hour_data: Dict, llm_summary: Optional[str]):
         """Save hourly summary to file"""
+        # One clock read, so the three time fields can't disagree across an hour boundary
+        now = datetime.now()
         summary = {
-            "timestamp": datetime.now().isoformat(),
-            "hour": datetime.now().strftime('%H:00'),
-            "date": datetime.now().date().isoformat(),
+            "timestamp": now.isoformat(),
+            "hour": now.strftime('%H:00'),
+            "date": now.date().isoformat(),
             "data": hour_data,
             "llm_summary": llm_summary if llm_summary else "LLM unavailable",
             "stats": {
@@ -1640,25 +1998,33 @@ Focus on progress, not perfection!"""
             }
         }
         
-        # Load existing summaries
-        summaries = []
-        if self.hourly_summaries_file.exists():
+        # Add to in-memory ring (keeps last 7 days / 168 hours), flush to disk every 6 hours
+        self._get_hourly_ring().append(summary)
+        self._hourly_unflushed += 1
+        
+        if self._hourly_unflushed >= 6:
+            self._flush_hourly_ring()
+
+    def _get_hourly_ring(self) -> deque:
+        """Get the in-memory hourly summary ring, loading it from disk on first use (empty if missing or unreadable)"""
+        if self._hourly_ring is None:
             try:
-                with open(self.hourly_summaries_file, 'r') as f:
-                    summaries = json.load(f)
-            except:
+                summaries = _read_json_file(self.hourly_summaries_file)
+            except (OSError, ValueError):
                 summaries = []
+            self._hourly_ring = deque(summaries, maxlen=168)
+        return self._hourly_ring
+
+    def _flush_hourly_ring(self):
+        """Write pending hourly summaries to disk"""
+        if self._hourly_ring is None or not self._hourly_unflushed:
+            return
         
-        # Add new summary
-        summaries.append(summary)
-        
-        # Keep last 7 days (168 hours)
-        if len(summaries) > 168:
-            summaries = summaries[-168:]
-        
-        # Save back
-        with open(self.hourly_summaries_file, 'w') as f:
-            json.dump(summaries, f, indent=2)
+        try:
+            _write_json_file(self.hourly_summaries_file, list(self._hourly_ring))
+            self._hourly_unflushed = 0
+        except Exception as e:
+            logger.error(f"Error saving hourly summaries: {e}")
 
     def generate_productivity_insights(self):
         """Generate LLM-powered productivity pattern insights"""
@@ -1670,12 +2036,16 @@ Focus on progress, not perfection!"""
             # Collect data from multiple sources
             insights_data = self._collect_insights_data()
             
-            # Generate LLM insights
+            # Too little data for the LLM to say anything meaningful - use the basic analysis
+            if not self._has_enough_insights_data(insights_data):
+                self._show_basic_productivity_insights(insights_data)
+                print("=" * 60 + "\n")
+                return
+            
+            # Generate LLM insights (streamed to the console as they are generated)
             llm_insights = self._generate_llm_productivity_insights(insights_data)
             
-            if llm_insights:
-                print(llm_insights)
-            else:
+            if not llm_insights:
                 print("🤖 LLM unavailable for detailed insights.")
                 self._show_basic_productivity_insights(insights_data)
                 
@@ -1685,37 +2055,98 @@ Focus on progress, not perfection!"""
         
         print("=" * 60 + "\n")
 
+    def generate_all_insights(self):
+        """Generate daily summary, weekly insights and productivity insights with concurrent LLM calls"""
+        try:
+            print("\n📊 Collecting data for all insights...")
+            summary_data = self._collect_summary_data()
+            weekly_data = self._collect_weekly_data()
+            insights_data = self._collect_insights_data()
+            
+            # The three LLM calls are independent, so run them side by side
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                daily_future = executor.submit(self._generate_llm_daily_summary, summary_data)
+                weekly_future = executor.submit(self._generate_llm_weekly_insights, weekly_data, False)
+                productivity_future = None
+                if self._has_enough_insights_data(insights_data):
+                    productivity_future = executor.submit(self._generate_llm_productivity_insights, insights_data, False)
+            
+            print("\n" + "=" * 60)
+            print("🌟 Daily Summary 🌟")
+            print("=" * 60)
+            llm_summary = daily_future.result()
+            if llm_summary:
+                print(llm_summary)
+            else:
+                self._show_basic_summary(summary_data)
+            self._save_end_of_day_summary(summary_data, llm_summary)
+            
+            print("\n" + "=" * 60)
+            print("📊 Weekly Pattern Insights 📊")
+            print("=" * 60)
+            weekly_insights = weekly_future.result()
+            if weekly_insights:
+                print(weekly_insights)
+            else:
+                print("🤖 LLM unavailable for detailed insights.")
+                self._show_basic_weekly_summary(weekly_data)
+            
+            print("\n" + "=" * 60)
+            print("🧠 Productivity Pattern Analysis")
+            print("=" * 60)
+            productivity_insights = productivity_future.result() if productivity_future else None
+            if productivity_insights:
+                print(productivity_insights)
+            else:
+                if productivity_future:
+                    print("🤖 LLM unavailable for detailed insights.")
+                self._show_basic_productivity_insights(insights_data)
+            
+        except Exception as e:
+            logger.error(f"Error generating insights: {e}")
+            print("Had trouble generating insights, but every session is valuable data! 📚")
+        
+        print("=" * 60 + "\n")
+
+    def _has_enough_insights_data(self, insights_data: Dict) -> bool:
+        """Check whether there is enough pattern data to be worth an LLM analysis"""
+        signal_count = (
+            len(insights_data.get('hourly_patterns', {}).get('most_productive_hours', [])) +
+            insights_data.get('intervention_effectiveness', {}).get('total_interventions', 0)
+        )
+        return signal_count >= 3
+
     def _collect_insights_data(self) -> Dict:
         """Collect comprehensive data for productivity insights"""
         insights_data = {
-            'hourly_patterns': [],
-            'daily_trends': [],
+            'hourly_patterns': {},
+            'daily_trends': {},
             'focus_patterns': {},
             'distraction_patterns': {},
             'intervention_effectiveness': {}
         }
         
         try:
-            # Load hourly summaries for pattern analysis
-            if self.hourly_summaries_file.exists():
-                with open(self.hourly_summaries_file, 'r') as f:
-                    hourly_data = json.load(f)
-                
+            # Load hourly summaries for pattern analysis (includes not-yet-flushed entries)
+            hourly_data = list(self._get_hourly_ring())
+            if hourly_data:
                 # Analyze hourly patterns
                 insights_data['hourly_patterns'] = self._analyze_hourly_patterns(hourly_data)
                 
             # Load daily summaries for trend analysis
-            if self.daily_summaries_file.exists():
-                with open(self.daily_summaries_file, 'r') as f:
-                    daily_data = json.load(f)
-                
+            try:
+                daily_data = self._load_json_history(self.daily_summaries_file)
+            except FileNotFoundError:
+                pass
+            else:
                 insights_data['daily_trends'] = self._analyze_daily_trends(daily_data)
                 
             # Load interactions for effectiveness analysis
-            if self.interactions_file.exists():
-                with open(self.interactions_file, 'r') as f:
-                    interactions = json.load(f)
-                
+            try:
+                interactions = self._load_json_history(self.interactions_file)
+            except FileNotFoundError:
+                pass
+            else:
                 insights_data['intervention_effectiveness'] = self._analyze_intervention_effectiveness(interactions)
                 
         except Exception as e:
@@ -1723,6 +2154,31 @@ Focus on progress, not perfection!"""
         
         return insights_data
 
+    def _load_json_history(self, path: Path) -> List[Dict]:
+        """Load a JSON history log, reusing the parsed copy until the file changes on disk.
+        The returned list is shared between callers and must not be modified."""
+        mtime = path.stat().st_mtime_ns
+        cached = self._history_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        data = _read_json_file(path)
+        self._history_cache[path] = (mtime, data)
+        return data
+
+    def _append_json_history(self, path: Path, entry: Dict, keep: int):
+        """Append an entry to a JSON history log, keeping only the newest `keep` entries. Starts
+        from the cached parse when the file is unchanged and leaves the cache holding what was written."""
+        try:
+            history = self._load_json_history(path)
+        except (OSError, ValueError):  # Missing or unreadable - start a fresh history
+            history = []
+        
+        # Build a new list: the cached one is shared with readers
+        history = [*history, entry][-keep:]
+        _write_json_file(path, history)
+        self._history_cache[path] = (path.stat().st_mtime_ns, history)
+
     def _analyze_hourly_patterns(self, hourly_data: List[Dict]) -> Dict:
         """Analyze patterns in hourly data"""
         patterns = {
@@ -1732,36 +2188,30 @@ Focus on progress, not perfection!"""
         }
         
         try:
-            # Group by hour of day
+            # Group by hour of day into [focus, distractions, count] accumulators
             hour_stats = {}
-            for entry in hourly_data[-168:]:  # Last week
-                hour = entry.get('hour', '00:00')
-                stats = entry.get('stats', {})
-                
-                if hour not in hour_stats:
-                    hour_stats[hour] = {'focus': 0, 'distractions': 0, 'count': 0}
-                
-                hour_stats[hour]['focus'] += stats.get('focus_sessions', 0)
-                hour_stats[hour]['distractions'] += stats.get('distractions', 0)
-                hour_stats[hour]['count'] += 1
+            for entry in islice(hourly_data, max(0, len(hourly_data) - 168), None):  # Last week
+                stats = entry.get('stats', _EMPTY)
+                totals = hour_stats.setdefault(entry.get('hour', '00:00'), [0, 0, 0])
+                totals[0] += stats.get('focus_sessions', 0)
+                totals[1] += stats.get('distractions', 0)
+                totals[2] += 1
             
             # Find patterns
             if hour_stats:
+                # Per-hour (hour, focus ratio, distraction ratio), computed once
+                entries = [
+                    (hour, focus / count, distractions / count)
+                    for hour, (focus, distractions, count) in hour_stats.items()
+                ]
+                
                 # Most productive hours (highest focus ratio)
-                productive_hours = sorted(
-                    hour_stats.items(), 
-                    key=lambda x: x[1]['focus'] / max(x[1]['count'], 1) if x[1]['count'] > 0 else 0, 
-                    reverse=True
-                )[:3]
-                patterns['most_productive_hours'] = [hour for hour, stats in productive_hours if stats['focus'] > 0]
+                productive_hours = heapq.nlargest(3, entries, key=itemgetter(1))
+                patterns['most_productive_hours'] = [hour for hour, focus_ratio, _ in productive_hours if focus_ratio > 0]
                 
                 # Distraction-prone hours
-                distraction_hours = sorted(
-                    hour_stats.items(),
-                    key=lambda x: x[1]['distractions'] / max(x[1]['count'], 1) if x[1]['count'] > 0 else 0,
-                    reverse=True
-                )[:2]
-                patterns['distraction_prone_hours'] = [hour for hour, stats in distraction_hours if stats['distractions'] > 0]
+                distraction_hours = heapq.nlargest(2, entries, key=itemgetter(2))
+                patterns['distraction_prone_hours'] = [hour for hour, _, distraction_ratio in distraction_hours if distraction_ratio > 0]
                 
         except Exception as e:
             logger.error(f"Error analyzing hourly patterns: {e}")
@@ -1780,13 +2230,18 @@ Focus on progress, not perfection!"""
             if len(daily_data) >= 3:
                 recent_days = daily_data[-7:]  # Last week
                 
-                # Calculate consistency (regular usage)
-                active_days = sum(1 for day in recent_days if day.get('stats', {}).get('interventions', 0) > 0)
+                columns = self._daily_stats_columns(recent_days)
+                interventions = columns['interventions']
+                focus_sessions = columns['focus_sessions']
+                distractions = columns['distractions']
+                
+                # Calculate consistency (regular usage) - list.count scans in C
+                active_days = len(interventions) - interventions.count(0)
                 trends['consistency_score'] = (active_days / len(recent_days)) * 100
                 
                 # Identify improvement areas
-                avg_focus = sum(day.get('stats', {}).get('focus_sessions_detected', 0) for day in recent_days) / len(recent_days)
-                avg_distractions = sum(day.get('stats', {}).get('distractions_detected', 0) for day in recent_days) / len(recent_days)
+                avg_focus = fmean(focus_sessions)
+                avg_distractions = fmean(distractions)
                 
                 if avg_distractions > avg_focus:
                     trends['improvement_areas'].append('Focus vs distraction balance')
@@ -1798,6 +2253,17 @@ Focus on progress, not perfection!"""
         
         return trends
 
+    def _daily_stats_columns(self, days: List[Dict]) -> Dict[str, List]:
+        """Split daily summaries into one list per metric (column layout) for the trend math"""
+        columns = {'date': [], 'interventions': [], 'focus_sessions': [], 'distractions': []}
+        for day in days:
+            stats = day.get('stats', _EMPTY)
+            columns['date'].append(day.get('date'))
+            columns['interventions'].append(stats.get('interventions', 0))
+            columns['focus_sessions'].append(stats.get('focus_sessions_detected', 0))
+            columns['distractions'].append(stats.get('distractions_detected', 0))
+        return columns
+
     def _analyze_intervention_effectiveness(self, interactions: List[Dict]) -> Dict:
         """Analyze how effective interventions are"""
         effectiveness = {
@@ -1807,87 +2273,171 @@ Focus on progress, not perfection!"""
         }
         
         try:
-            # Count interventions by state
-            state_counts = {}
-            for interaction in interactions[-50:]:  # Last 50 interactions
-                state = interaction.get('state', 'unknown')
-                state_counts[state] = state_counts.get(state, 0) + 1
+            # Count interventions by state (last 50 interactions)
+            state_counts = Counter(interaction.get('state', 'unknown') for interaction in interactions[-50:])
             
-            effectiveness['state_breakdown'] = state_counts
+            # Most frequent states first so consumers can take the top entries directly
+            effectiveness['state_breakdown'] = dict(state_counts.most_common())
             
         except Exception as e:
             logger.error(f"Error analyzing intervention effectiveness: {e}")
         
         return effectiveness
 
-    def _generate_llm_productivity_insights(self, insights_data: Dict) -> Optional[str]:
-        """Generate comprehensive productivity insights using LLM"""
+    def _generate_llm_productivity_insights(self, insights_data: Dict, echo: bool = True) -> Optional[str]:
+        """Generate comprehensive productivity insights using LLM, printing them as they stream in if echo is set"""
         try:
-            prompt = f"""Please analyze this ADHD user's productivity patterns and provide personalized insights.
-
-📊 PRODUCTIVITY PATTERN DATA:
-
-⏰ HOURLY PATTERNS:
-- Most productive hours: {', '.join(insights_data.get('hourly_patterns', {}).get('most_productive_hours', ['None identified']))}
-- Distraction-prone times: {', '.join(insights_data.get('hourly_patterns', {}).get('distraction_prone_hours', ['None identified']))}
-
-📈 DAILY TRENDS:
-- Consistency score: {insights_data.get('daily_trends', {}).get('consistency_score', 0):.1f}%
-- Improvement areas: {', '.join(insights_data.get('daily_trends', {}).get('improvement_areas', ['Great job overall!']))}
-
-🎯 INTERVENTION DATA:
-- Total interactions: {insights_data.get('intervention_effectiveness', {}).get('total_interventions', 0)}
-- State breakdown: {dict(list(insights_data.get('intervention_effectiveness', {}).get('state_breakdown', {}).items())[:3])}
-
-Please provide:
-1. **Pattern Recognition**: What interesting patterns do you notice?
-2. **ADHD-Specific Insights**: How do these patterns relate to ADHD traits?
-3. **Personalized Suggestions**: 2-3 specific, actionable recommendations
-4. **Encouragement**: Celebrate what's working well
-5. **Future Focus**: Gentle suggestions for optimization
-
-GUIDELINES:
-- Be supportive and understanding of ADHD challenges
-- Focus on patterns, not judgments
-- Offer specific, actionable suggestions
-- Celebrate small wins and progress
-- Keep tone warm and encouraging
-- Use emojis appropriately
-- Limit to 400 words
+            hourly_patterns = insights_data.get('hourly_patterns', {})
+            daily_trends = insights_data.get('daily_trends', {})
+            intervention_data = insights_data.get('intervention_effectiveness', {})
+            top_states = dict(islice(intervention_data.get('state_breakdown', {}).items(), 3))
+            
+            # Compact data payload - all instructions live in the system prompt
+            pattern_data = {
+                'most_productive_hours': hourly_patterns.get('most_productive_hours') or ['None identified'],
+                'distraction_prone_hours': hourly_patterns.get('distraction_prone_hours') or ['None identified'],
+                'consistency_score_pct': round(daily_trends.get('consistency_score', 0), 1),
+                'improvement_areas': daily_trends.get('improvement_areas') or ['Great job overall!'],
+                'total_interactions': intervention_data.get('total_interventions', 0),
+                'state_breakdown': top_states
+            }
+            
+            prompt = f"""Productivity pattern data:
+{_json_dumps(pattern_data).decode('utf-8')}
 
-Remember: Every person with ADHD has unique patterns - help them understand theirs!"""
+Give ADHD-focused insights (max 250 words)."""
 
-            system_prompt = "You are a specialized ADHD productivity coach analyzing behavioral patterns. Provide insights that are understanding, encouraging, and actionable for someone with ADHD."
+            system_prompt = _PRODUCTIVITY_SYSTEM_PROMPT
             
+            # Identical data produces an identical prompt - reuse a recent answer if we have one
+            cache_key = hashlib.blake2b(
+                "\0".join((self.model, system_prompt, prompt)).encode('utf-8'), digest_size=16
+            ).hexdigest()
+            cached_insights = self._read_insights_cache(cache_key)
+            if cached_insights:
+                if echo:
+                    print(cached_insights)
+                return cached_insights
+            
+            options = _LLM_OPTIONS["insights"]
             request_data = {
                 "model": self.model,
                 "prompt": prompt,
-                "system": system_prompt,
-                "stream": False,
+                **_INSIGHTS_REQUEST,
                 "options": {
-                    "temperature": 0.8,
-                    "num_predict": 400,
-                    "num_ctx": 8192,  # Use full 8K context window
-                    "top_k": 40,
-                    "top_p": 0.9
+                    **options, "num_ctx": _context_size(system_prompt, prompt, num_predict=options["num_predict"])
                 }
             }
             
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json=request_data,
+            response = self.http.post(
+                self._generate_url,
+                data=_json_dumps(request_data),
+                headers=_JSON_HEADERS,
+                stream=True,
                 timeout=45
             )
             
             if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "").strip()
+                try:
+                    llm_response = self._read_streamed_response(response, echo=echo)
+                    self._write_insights_cache(cache_key, llm_response)
+                    return llm_response
+                except StreamInterrupted as e:
+                    # Already on screen - keep what was shown rather than print it again, but don't cache it
+                    logger.warning("Productivity insights were cut off")
+                    return e.partial or None
+                except ValueError as e:
+                    logger.debug(f"Error parsing streamed insights, retrying without streaming: {e}")
+                
+                # Fall back to a regular (non-streamed) request
+                request_data["stream"] = False
+                response = self.http.post(
+                    self._generate_url,
+                    data=_json_dumps(request_data),
+                    headers=_JSON_HEADERS,
+                    timeout=45
+                )
+                if response.status_code == 200:
+                    llm_response = _json_loads(response.content).get("response", "").strip()
+                    if echo:
+                        print(llm_response)
+                    self._write_insights_cache(cache_key, llm_response)
+                    return llm_response
             
         except Exception as e:
             logger.debug(f"Error generating productivity insights: {e}")
         
         return None
 
+    def _read_insights_cache(self, cache_key: str) -> Optional[str]:
+        """Return cached insights for this key if present and not expired"""
+        cache_file = self.insights_cache_dir / f"{cache_key}.txt"
+        try:
+            if time.time() - cache_file.stat().st_mtime < self.insights_cache_ttl:
+                return cache_file.read_text(encoding='utf-8')
+        except OSError:
+            pass
+        return None
+
+    def _write_insights_cache(self, cache_key: str, insights: str):
+        """Store generated insights under this key"""
+        if not insights:
+            return
+        try:
+            self.insights_cache_dir.mkdir(exist_ok=True)
+            self._prune_insights_cache()
+            (self.insights_cache_dir / f"{cache_key}.txt").write_text(insights, encoding='utf-8')
+        except OSError as e:
+            logger.debug(f"Error caching productivity insights: {e}")
+
+    def _prune_insights_cache(self):
+        """Delete cached insights that have expired, so the cache directory doesn't grow forever"""
+        expired_before = time.time() - self.insights_cache_ttl
+        for cache_file in self.insights_cache_dir.glob("*.txt"):
+            try:
+                if cache_file.stat().st_mtime < expired_before:
+                    cache_file.unlink()
+            except OSError:
+                pass  # Already gone, or not ours to delete
+
+    def _read_streamed_response(self, response, echo: bool = False,
+                                stop_when: Optional[Callable[[str], bool]] = None) -> str:
+        """Collect a streamed Ollama response, optionally echoing tokens to stdout as they arrive.
+        If stop_when is given it is checked whenever a chunk closes a brace, and the stream is
+        abandoned (which also stops generation server-side) once it returns True.
+        Raises StreamInterrupted if the stream breaks after some of it has been echoed."""
+        chunks = []
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                
+                data = _json_loads(line)
+                chunk = data.get("response", "")
+                chunks.append(chunk)
+                
+                if echo:
+                    sys.stdout.write(chunk)
+                    sys.stdout.flush()
+                
+                if data.get("done"):
+                    break
+                
+                if stop_when and '}' in chunk and stop_when("".join(chunks)):
+                    break
+        except Exception as e:
+            if echo and any(chunks):
+                logger.debug(f"Streamed response interrupted: {e}")
+                raise StreamInterrupted("".join(chunks).strip()) from e
+            raise
+        finally:
+            response.close()
+            if echo and chunks:
+                sys.stdout.write("\n")
+                sys.stdout.flush()
+        
+        return "".join(chunks).strip()
+
     def _show_basic_productivity_insights(self, insights_data: Dict):
         """Show basic insights if LLM unavailable"""
         hourly = insights_data.get('hourly_patterns', {})
@@ -1910,7 +2460,8 @@ Remember: Every person with ADHD has unique patterns - help them understand thei
         print("• You're building valuable self-awareness!")
 
 
-def main():
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser"""
     parser = argparse.ArgumentParser(description="Companion Cube - ADHD Productivity Assistant")
     parser.add_argument("--mode", choices=["ghost", "coach", "study_buddy", "weekend"], 
                        default="coach", help="Companion mode")
@@ -1918,20 +2469,51 @@ def main():
                        help="Check interval in seconds")
     parser.add_argument("--model", type=str, default="mistral",
                        help="Ollama model to use")
-    parser.add_argument("--test", action="store_true", 
-                       help="Run a single check for testing")
-    parser.add_argument("--test-connections", action="store_true",
-                       help="Test connections and exit")
-    parser.add_argument("--daily-summary", action="store_true",
-                       help="Generate daily summary and exit")
     parser.add_argument("--verbose", action="store_true",
                        help="Enable verbose mode with detailed LLM prompts and processing info")
-    parser.add_argument("--weekly-insights", action="store_true",
-                       help="Generate weekly pattern insights using LLM")
-    parser.add_argument("--productivity-insights", action="store_true",
-                       help="Generate comprehensive productivity pattern analysis using LLM")
     
-    args = parser.parse_args()
+    # One-shot commands; each stores its name in args.command, which main() looks up in _COMMANDS
+    commands = parser.add_mutually_exclusive_group()
+    commands.add_argument("--test", action="store_const", dest="command", const="test",
+                         help="Run a single check for testing")
+    commands.add_argument("--test-connections", action="store_const", dest="command", const="test-connections",
+                         help="Test connections and exit")
+    commands.add_argument("--daily-summary", action="store_const", dest="command", const="daily-summary",
+                         help="Generate daily summary and exit")
+    commands.add_argument("--weekly-insights", action="store_const", dest="command", const="weekly-insights",
+                         help="Generate weekly pattern insights using LLM")
+    commands.add_argument("--productivity-insights", action="store_const", dest="command",
+                         const="productivity-insights",
+                         help="Generate comprehensive productivity pattern analysis using LLM")
+    commands.add_argument("--all-insights", action="store_const", dest="command", const="all-insights",
+                         help="Generate daily summary, weekly and productivity insights concurrently")
+    return parser
+
+
+def _run_single_check(cube: CompanionCube):
+    """Test connections, then run one activity check"""
+    print("Running single test check...")
+    cube.test_connections()
+    print("\nPerforming activity check...")
+    cube.check_activity()
+
+
+# One-shot commands selected on the command line, by the name the parser stores in args.command
+_COMMANDS = {
+    "test": _run_single_check,
+    "test-connections": CompanionCube.test_connections,
+    "daily-summary": CompanionCube.generate_end_of_day_summary,
+    "weekly-insights": CompanionCube.generate_weekly_insights,
+    "productivity-insights": CompanionCube.generate_productivity_insights,
+    "all-insights": CompanionCube.generate_all_insights,
+}
+
+
+_PARSER = _build_parser()
+
+
+def main():
+    args = _PARSER.parse_args()
     
     cube = CompanionCube(check_interval=args.interval, mode=args.mode, verbose=args.verbose)
     cube.model = args.model
@@ -1939,27 +2521,8 @@ def main():
     print("\n🧊 Companion Cube - ADHD Productivity Assistant 🧊")
     print("=" * 60)
     
-    if args.test_connections:
-        cube.test_connections()
-        return
-    
-    if args.daily_summary:
-        cube.generate_end_of_day_summary()
-        return
-    
-    if args.weekly_insights:
-        cube.generate_weekly_insights()
-        return
-    
-    if args.productivity_insights:
-        cube.generate_productivity_insights()
-        return
-    
-    if args.test:
-        print("Running single test check...")
-        cube.test_connections()
-        print("\nPerforming activity check...")
-        cube.check_activity()
+    if args.command:
+        _COMMANDS[args.command](cube)
         return
     
     print("I'm here to support you, not judge you.")
@@ -1,12 +1,66 @@
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple
+import heapq
 import logging
 import re
 from collections import defaultdict, Counter
-from urllib.parse import urlparse
+from itertools import groupby
+from operator import itemgetter
+from functools import lru_cache
+from urllib.parse import urlsplit
 
 logger = logging.getLogger(__name__)
 
+# Sort key for events and timeline entries (itemgetter runs in C, unlike a lambda)
+_BY_TIMESTAMP = itemgetter('timestamp')
+
+@lru_cache(maxsize=4096)
+def _domain_of(url: str) -> str:
+    """Network location of a URL without a leading www. (memoized: the same pages come up over and over)"""
+    try:
+        domain = urlsplit(url).netloc
+    except ValueError:
+        return 'unknown'
+    # Remove www. prefix
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    return domain
+
+# Intervention prompt text before and after the activity context, per user state
+_ADHD_PROMPTS = {
+    "flow": (
+        "You are an ADHD coach. The user is in a flow state. ",
+        "\nRespond with brief encouragement (max 20 words). Acknowledge their focus and remind them they're doing great. "
+        "\nNo suggestions or interruptions - just positive reinforcement."
+    ),
+    "needs_nudge": (
+        "You are a gentle ADHD companion. ",
+        "\nThe user might be stuck or distracted. Provide:"
+        "\n1) Acknowledge what you see without judgment"
+        "\n2) One specific, tiny next action they could take"
+        "\n3) Encouragement that any progress is good progress"
+        "\nKeep it under 40 words, warm and supportive."
+    ),
+    "working": (
+        "The user is working steadily. ",
+        "\nProvide a brief acknowledgment of their progress. If they've been on the same task >45 min, gently suggest a stretch."
+        "\nKeep it to one supportive sentence, max 20 words."
+    ),
+}
+_DEFAULT_ADHD_PROMPT = (
+    "You are a supportive ADHD companion. ",
+    "\nProvide brief, encouraging feedback about their current activity. Max 20 words."
+)
+# The welcome-back prompt doesn't use the activity context
+_AFK_PROMPT = (
+    "The user just returned to their computer. Welcome them back warmly and ask what they'd like to focus on next."
+    "\nKeep it brief and encouraging, max 20 words."
+)
+
+def _keyword_re(keywords: List[str]) -> re.Pattern:
+    """Compile keywords into one alternation that matches if any keyword is a substring"""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
 class EventProcessor:
     def __init__(self):
         self.distraction_apps = {
@@ -30,9 +84,24 @@ class EventProcessor:
             'research': ['chrome', 'firefox', 'safari', 'edge', 'brave']
         }
         
+        # Keyword lists compiled once into per-category regexes (matched against lowercased names)
+        self._productivity_app_res = [(category, _keyword_re(apps)) for category, apps in self.productivity_apps.items()]
+        self._distraction_app_res = [(category, _keyword_re(apps)) for category, apps in self.distraction_apps.items()]
+        self._distraction_app_re = _keyword_re([app for apps in self.distraction_apps.values() for app in apps])
+        self._distraction_domain_res = [(category, _keyword_re(domains)) for category, domains in self.distraction_domains.items()]
+        self._distraction_domain_re = _keyword_re([d for domains in self.distraction_domains.values() for d in domains])
+        
+        # Category per app / domain name; the same handful of names recur in every batch of events
+        self._app_categories: Dict[str, str] = {}
+        self._domain_categories: Dict[str, str] = {}
+        self.max_category_cache_size = 4096
+        
         self.focus_threshold_minutes = 15
         self.rapid_switching_threshold = 5
         self.rapid_switching_window = 10
+        
+        # Caps on what is handed to the LLM, so prompt size stays bounded during switching bursts
+        self.max_llm_context_switches = 50
     
     def filter_and_summarize_data(self, multi_timeframe_data: Dict[str, Dict[str, List[dict]]]) -> Dict[str, Dict]:
         """Filter clutter and create clean summaries for each timeframe"""
@@ -77,7 +146,8 @@ class EventProcessor:
         if not afk_events:
             return False
         
-        latest_event = max(afk_events, key=lambda x: x['timestamp'])
+        # ActivityWatchClient hands events over sorted by timestamp, so the newest is last
+        latest_event = afk_events[-1]
         return latest_event.get('data', {}).get('status') == 'afk'
     
     def _summarize_window_events(self, events: List[dict]) -> Dict:
@@ -85,87 +155,83 @@ class EventProcessor:
         if not events:
             return {}
         
-        app_durations = defaultdict(float)
-        app_titles = defaultdict(list)
+        app_durations = Counter()
+        app_titles = defaultdict(dict)  # Titles per app as an ordered set (dict keys)
         focus_sessions = []
-        app_switches = 0
+        # Bound once as locals; the loops below run per event / per session
+        focus_threshold = self.focus_threshold_minutes
+        categorize_app = self._categorize_app
         
         # Sort events by timestamp
-        events.sort(key=lambda x: x['timestamp'])
+        events.sort(key=_BY_TIMESTAMP)
         
-        # Group consecutive events by app
-        current_app = None
-        session_start = None
-        session_duration = 0
-        
-        for i, event in enumerate(events):
-            app = event.get('data', {}).get('app', '').lower()
-            title = event.get('data', {}).get('title', '')
+        # Pull out (app, title, minutes, timestamp) once per event, skipping very short
+        # events (less than 3 seconds) - they neither count as usage nor break up a session
+        rows = []
+        for event in events:
             duration = event.get('duration', 0) / 60  # Convert to minutes
-            
-            # Skip very short events (less than 3 seconds)
             if duration < 0.05:
                 continue
-            
-            # Track app usage
-            if app:
-                app_durations[app] += duration
-                if title and title not in app_titles[app]:
-                    app_titles[app].append(title)
-            
-            # Track app switches and sessions
-            if app != current_app:
-                # Save previous session if it was a focus session
-                if current_app and session_duration >= self.focus_threshold_minutes:
-                    focus_sessions.append({
-                        'app': current_app,
-                        'duration_minutes': session_duration,
-                        'start_time': session_start,
-                        'category': self._categorize_app(current_app)
-                    })
-                
-                if current_app is not None:
-                    app_switches += 1
-                
-                current_app = app
-                session_start = event.get('timestamp')
-                session_duration = duration
-            else:
+            data = event.get('data', {})
+            rows.append((data.get('app', '').lower(), data.get('title', ''), duration, event.get('timestamp')))
+        
+        # Each run of consecutive events in the same app is one session
+        sessions = 0
+        for app, run in groupby(rows, key=itemgetter(0)):
+            sessions += 1
+            session_start = None
+            session_duration = 0
+            for _, title, duration, timestamp in run:
+                if session_start is None:
+                    session_start = timestamp
                 session_duration += duration
+                
+                # Track app usage
+                if app:
+                    app_durations[app] += duration
+                    if title:
+                        app_titles[app][title] = None
+            
+            # Save the session if it was a focus session
+            if app and session_duration >= focus_threshold:
+                focus_sessions.append({
+                    'app': app,
+                    'duration_minutes': session_duration,
+                    'start_time': session_start,
+                    'category': categorize_app(app)
+                })
         
-        # Check final session
-        if current_app and session_duration >= self.focus_threshold_minutes:
-            focus_sessions.append({
-                'app': current_app,
-                'duration_minutes': session_duration,
-                'start_time': session_start,
-                'category': self._categorize_app(current_app)
-            })
+        # Every session after the first started with a switch
+        app_switches = max(sessions - 1, 0)
         
         # Calculate total active time
         total_active_time = sum(app_durations.values())
         
-        # Get top apps
-        top_apps = sorted(app_durations.items(), key=lambda x: x[1], reverse=True)[:5]
+        # Get top apps (most_common(k) is a heap select, not a full sort)
+        top_apps = app_durations.most_common(5)
         
         # Identify distractions
         distractions = []
+        is_distraction_app = self._is_distraction_app
         for app, duration in app_durations.items():
-            if self._is_distraction_app(app) and duration > 2:  # More than 2 minutes
+            if duration > 2 and is_distraction_app(app):  # More than 2 minutes
                 distractions.append({
                     'type': 'app',
                     'name': app,
                     'duration_minutes': duration,
-                    'category': self._categorize_app(app)
+                    'category': categorize_app(app)
                 })
         
+        # Titles in first-seen order
+        app_titles = {app: list(titles) for app, titles in app_titles.items()}
+        
         # Identify key activities from titles
         key_activities = self._extract_key_activities(app_titles)
         
         return {
             'active_time_minutes': total_active_time,
             'app_summary': dict(top_apps),
-            'app_titles': dict(app_titles),
+            'app_titles': app_titles,
             'focus_sessions': focus_sessions,
             'distractions': distractions,
             'app_switches': app_switches,
@@ -177,24 +243,28 @@ class EventProcessor:
         if not events:
             return {}
         
-        domain_durations = defaultdict(float)
-        domain_titles = defaultdict(list)
+        domain_durations = Counter()
+        domain_titles = defaultdict(dict)  # Titles per domain as an ordered set (dict keys)
         distractions = []
+        # Bound once as locals; the loop below runs per event
+        extract_domain = self._extract_domain
+        is_distraction_domain = self._is_distraction_domain
         
         for event in events:
-            url = event.get('data', {}).get('url', '')
-            title = event.get('data', {}).get('title', '')
+            data = event.get('data', {})
+            url = data.get('url', '')
+            title = data.get('title', '')
             duration = event.get('duration', 0) / 60  # Convert to minutes
             
             if url:
-                domain = self._extract_domain(url)
+                domain = extract_domain(url)
                 domain_durations[domain] += duration
                 
-                if title and title not in domain_titles[domain]:
-                    domain_titles[domain].append(title)
+                if title:
+                    domain_titles[domain][title] = None
                 
                 # Check if it's a distraction
-                if self._is_distraction_domain(domain) and duration > 1:
+                if duration > 1 and is_distraction_domain(domain):
                     distractions.append({
                         'type': 'web',
                         'name': domain,
@@ -203,40 +273,38 @@ class EventProcessor:
                     })
         
         # Get top domains
-        top_domains = sorted(domain_durations.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_domains = domain_durations.most_common(5)
         
         return {
             'domain_summary': dict(top_domains),
-            'domain_titles': dict(domain_titles),
+            'domain_titles': {domain: list(titles) for domain, titles in domain_titles.items()},
             'distractions': distractions,
             'total_web_time': sum(domain_durations.values())
         }
     
     def _extract_domain(self, url: str) -> str:
         """Extract domain from URL"""
-        try:
-            parsed = urlparse(url)
-            domain = parsed.netloc
-            # Remove www. prefix
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            return domain
-        except:
-            return 'unknown'
+        return _domain_of(url)
     
     def _is_distraction_domain(self, domain: str) -> bool:
         """Check if a domain is distracting"""
-        domain_lower = domain.lower()
-        for domains in self.distraction_domains.values():
-            if any(dist_domain in domain_lower for dist_domain in domains):
-                return True
-        return False
+        return self._distraction_domain_re.search(domain.lower()) is not None
     
     def _categorize_domain(self, domain: str) -> str:
-        """Categorize a domain"""
+        """Categorize a domain (memoized per domain)"""
+        category = self._domain_categories.get(domain)
+        if category is None:
+            category = self._match_domain_category(domain)
+            if len(self._domain_categories) >= self.max_category_cache_size:
+                self._domain_categories.clear()
+            self._domain_categories[domain] = category
+        return category
+    
+    def _match_domain_category(self, domain: str) -> str:
+        """Run the domain category patterns against a domain"""
         domain_lower = domain.lower()
-        for category, domains in self.distraction_domains.items():
-            if any(dist_domain in domain_lower for dist_domain in domains):
+        for category, pattern in self._distraction_domain_res:
+            if pattern.search(domain_lower):
                 return f"distraction_{category}"
         return "neutral"
     
@@ -369,7 +437,7 @@ class EventProcessor:
             window_events = data.get('window', [])
             if window_events:
                 # Sort by timestamp
-                window_events.sort(key=lambda x: x['timestamp'])
+                window_events.sort(key=_BY_TIMESTAMP)
                 
                 processed_windows = []
                 last_app = None
@@ -443,7 +511,7 @@ class EventProcessor:
         # Remove duplicates (same timestamp) and sort by recency
         seen_events = set()
         unique_window_events = []
-        for event in sorted(all_window_events, key=lambda x: x['timestamp'], reverse=True):
+        for event in sorted(all_window_events, key=_BY_TIMESTAMP, reverse=True):
             event_key = (event['timestamp'], event['app'])
             if event_key not in seen_events:
                 seen_events.add(event_key)
@@ -451,7 +519,7 @@ class EventProcessor:
         
         seen_web_events = set()
         unique_web_events = []
-        for event in sorted(all_web_events, key=lambda x: x['timestamp'], reverse=True):
+        for event in sorted(all_web_events, key=_BY_TIMESTAMP, reverse=True):
             event_key = (event['timestamp'], event.get('url', ''))
             if event_key not in seen_web_events:
                 seen_web_events.add(event_key)
@@ -469,7 +537,9 @@ class EventProcessor:
         # Extract context switches with timing from recent data
         recent_data = raw_data['timeframes'].get('5_minutes', {})
         if recent_data:
-            raw_data['context_switches'] = self._extract_context_switches(recent_data.get('window_events', []))
+            switches = self._extract_context_switches(recent_data.get('window_events', []))
+            raw_data['total_context_switches'] = len(switches)
+            raw_data['context_switches'] = switches[-self.max_llm_context_switches:]  # Most recent only
         
         # Add pattern analysis across timeframes
         raw_data['patterns'] = self._analyze_cross_timeframe_patterns(raw_data['timeframes'])
@@ -502,7 +572,7 @@ class EventProcessor:
             })
         
         # Sort by timestamp
-        timeline.sort(key=lambda x: x['timestamp'])
+        timeline.sort(key=_BY_TIMESTAMP)
         return timeline
     
     def _create_prioritized_timeline(self, window_events: List[dict], web_events: List[dict], timeframes: Dict) -> List[dict]:
@@ -528,7 +598,7 @@ class EventProcessor:
         # Skip web events due to timing inaccuracies - focus on window events only
         
         # Sort 5-minute events by recency and limit to 30
-        five_min_events.sort(key=lambda x: x['timestamp'], reverse=True)
+        five_min_events.sort(key=_BY_TIMESTAMP, reverse=True)
         timeline.extend(five_min_events[:30])  # Limit 5-minute data to 30 activities
         
         # Priority 2: Representative events from longer timeframes for context
@@ -542,7 +612,7 @@ class EventProcessor:
             
             # Add top 5 longest window events from each timeframe
             if window_events_tf:
-                significant_windows = sorted(window_events_tf, key=lambda x: x['duration_minutes'], reverse=True)[:5]
+                significant_windows = heapq.nlargest(5, window_events_tf, key=itemgetter('duration_minutes'))
                 for event in significant_windows:
                     # Avoid duplicates from 5-minute timeframe
                     if not any(e['timestamp'] == event['timestamp'] and e['type'] == 'app' for e in timeline):
@@ -662,27 +732,32 @@ class EventProcessor:
         return " ".join(context_parts) if context_parts else "Limited activity data available."
     
     def _categorize_app(self, app: str) -> str:
-        """Categorize an application as productive, distraction, or neutral"""
+        """Categorize an application as productive, distraction, or neutral (memoized per app)"""
+        category = self._app_categories.get(app)
+        if category is None:
+            category = self._match_app_category(app)
+            if len(self._app_categories) >= self.max_category_cache_size:
+                self._app_categories.clear()
+            self._app_categories[app] = category
+        return category
+    
+    def _match_app_category(self, app: str) -> str:
+        """Run the app category patterns against an application name"""
         app_lower = app.lower()
         
-        for category, apps in self.productivity_apps.items():
-            if any(prod_app in app_lower for prod_app in apps):
+        for category, pattern in self._productivity_app_res:
+            if pattern.search(app_lower):
                 return f"productive_{category}"
         
-        for category, apps in self.distraction_apps.items():
-            if any(dist_app in app_lower for dist_app in apps):
+        for category, pattern in self._distraction_app_res:
+            if pattern.search(app_lower):
                 return f"distraction_{category}"
         
         return "neutral"
     
     def _is_distraction_app(self, app: str) -> bool:
         """Check if an application is considered distracting"""
-        app_lower = app.lower()
-        all_distractions = []
-        for apps in self.distraction_apps.values():
-            all_distractions.extend(apps)
-        
-        return any(dist_app in app_lower for dist_app in all_distractions)
+        return self._distraction_app_re.search(app.lower()) is not None
     
     def _infer_task_from_title(self, title: str, app: str) -> str:
         """Infer what task the user is working on from window title"""
@@ -725,28 +800,8 @@ class EventProcessor:
     
     def generate_adhd_prompt(self, state: str, context: str, timeframe_context: Dict = None) -> str:
         """Generate ADHD-appropriate prompt based on state and context"""
-        if state == "flow":
-            return f"""You are an ADHD coach. The user is in a flow state. {context}
-Respond with brief encouragement (max 20 words). Acknowledge their focus and remind them they're doing great. 
-No suggestions or interruptions - just positive reinforcement."""
-        
-        elif state == "needs_nudge":
-            return f"""You are a gentle ADHD companion. {context}
-The user might be stuck or distracted. Provide:
-1) Acknowledge what you see without judgment
-2) One specific, tiny next action they could take
-3) Encouragement that any progress is good progress
-Keep it under 40 words, warm and supportive."""
-        
-        elif state == "working":
-            return f"""The user is working steadily. {context}
-Provide a brief acknowledgment of their progress. If they've been on the same task >45 min, gently suggest a stretch.
-Keep it to one supportive sentence, max 20 words."""
-        
-        elif state == "afk":
-            return f"""The user just returned to their computer. Welcome them back warmly and ask what they'd like to focus on next.
-Keep it brief and encouraging, max 20 words."""
+        if state == "afk":
+            return _AFK_PROMPT
         
-        else:
-            return f"""You are a supportive ADHD companion. {context}
-Provide brief, encouraging feedback about their current activity. Max 20 words."""
\ No newline at end of file
+        prefix, suffix = _ADHD_PROMPTS.get(state, _DEFAULT_ADHD_PROMPT)
+        return f"{prefix}{context}{suffix}"
\ No newline at end of file